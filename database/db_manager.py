@@ -4,7 +4,7 @@
 import aiosqlite
 import logging
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
 
 class DatabaseManager:
@@ -18,6 +18,10 @@ class DatabaseManager:
         """Initialize database with required tables"""
         try:
             async with aiosqlite.connect(self.db_path) as db:
+                # WAL keeps readers from blocking writers: the streaming
+                # broadcast cursor can stay open for the whole send without
+                # starving inserts from other connections.
+                await db.execute("PRAGMA journal_mode=WAL")
                 # Check and update old schema if needed
                 await self._migrate_old_schema(db)
                 await self._create_tables(db)
@@ -306,6 +310,31 @@ class DatabaseManager:
             )
         """)
         
+        # Broadcast delivery audit table
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS broadcast_deliveries (
+                delivery_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sender_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users (user_id)
+            )
+        """)
+
+        # Sent-reminder tracking for the smart reminder system - created
+        # here with the rest of the schema so the reminder loop never
+        # runs DDL
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS exam_reminders (
+                exam_id INTEGER,
+                reminder_percent INTEGER,
+                sent_at TEXT,
+                PRIMARY KEY (exam_id, reminder_percent)
+            )
+        """)
+
         # Favorites table
         await db.execute("""
             CREATE TABLE IF NOT EXISTS favorites (
@@ -483,36 +512,84 @@ class DatabaseManager:
 
     # ========== BROADCAST SUPPORT ==========
 
-    async def get_all_users_for_admin_broadcast(self, filter_type: str = 'all') -> List[Dict[str, Any]]:
+    @staticmethod
+    def _broadcast_users_query(filter_type: str, sender_id: Optional[int]) -> Tuple[str, List[Any]]:
+        """Build the recipient query for a broadcast filter"""
+        query = "SELECT user_id, full_name, username FROM users WHERE is_blocked = 0"
+        params: List[Any] = []
+
+        if filter_type == 'managers':
+            # Get users who manage at least one class
+            query = """
+                SELECT DISTINCT u.user_id, u.full_name, u.username
+                FROM users u
+                JOIN classes c ON u.user_id = c.manager_id
+                WHERE u.is_blocked = 0
+            """
+        elif filter_type == 'students':
+            # All users are effectively students
+            pass
+        elif filter_type == 'owners':
+            query += " AND is_superadmin = 1"
+
+        # Exclude the sender in SQL so callers don't re-filter the
+        # full result list in Python.
+        if sender_id is not None:
+            column = "u.user_id" if filter_type == 'managers' else "user_id"
+            query += f" AND {column} != ?"
+            params.append(sender_id)
+
+        return query, params
+
+    async def get_all_users_for_admin_broadcast(self, filter_type: str = 'all',
+                                                sender_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get users for broadcast based on filter"""
         try:
             async with aiosqlite.connect(self.db_path) as db:
                 db.row_factory = aiosqlite.Row
-                
-                query = "SELECT user_id, full_name, username FROM users WHERE is_blocked = 0"
-                
-                if filter_type == 'managers':
-                    # Get users who manage at least one class
-                    query = """
-                        SELECT DISTINCT u.user_id, u.full_name, u.username 
-                        FROM users u 
-                        JOIN classes c ON u.user_id = c.manager_id 
-                        WHERE u.is_blocked = 0
-                    """
-                elif filter_type == 'students':
-                    # All users are effectively students
-                    pass
-                elif filter_type == 'owners':
-                    query += " AND is_superadmin = 1"
-                
-                async with db.execute(query) as cursor:
+                query, params = self._broadcast_users_query(filter_type, sender_id)
+                async with db.execute(query, params) as cursor:
                     rows = await cursor.fetchall()
                     return [dict(row) for row in rows]
         except Exception as e:
             self.logger.error(f"Error getting broadcast users ({filter_type}): {e}")
             return []
 
-    async def save_broadcast_message(self, sender_id: int, target_type: str, target_id: Optional[int], 
+    async def stream_users_for_admin_broadcast(self, filter_type: str = 'all',
+                                               sender_id: Optional[int] = None,
+                                               chunk_size: int = 1000):
+        """Yield broadcast recipients in chunks of `chunk_size`.
+
+        Keeps memory flat for huge audiences: sending can start after the
+        first fetchmany instead of after the whole result set is built.
+        """
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                db.row_factory = aiosqlite.Row
+                query, params = self._broadcast_users_query(filter_type, sender_id)
+                async with db.execute(query, params) as cursor:
+                    while True:
+                        rows = await cursor.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        yield [dict(row) for row in rows]
+        except Exception as e:
+            self.logger.error(f"Error streaming broadcast users ({filter_type}): {e}")
+
+    async def verify_class_management(self, user_id: int, class_id: int) -> bool:
+        """Verify if user is the manager of a specific class - one query"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                async with db.execute("""
+                    SELECT 1 FROM classes
+                    WHERE class_id = ? AND manager_id = ? AND is_active = 1
+                """, (class_id, user_id)) as cursor:
+                    return await cursor.fetchone() is not None
+        except Exception as e:
+            self.logger.error(f"❌ Error verifying class management: {e}")
+            return False
+
+    async def save_broadcast_message(self, sender_id: int, target_type: str, target_id: Optional[int],
                                    message_text: Optional[str], message_type: str, file_id: Optional[str]):
         """Save broadcast message record"""
         try:
@@ -531,6 +608,25 @@ class DatabaseManager:
         except Exception as e:
             self.logger.error(f"Error saving broadcast message: {e}")
 
+    async def bulk_insert_broadcast_deliveries(self, sender_id: int,
+                                               rows: List[Tuple[int, str, Optional[str]]]):
+        """Insert per-user delivery results in one transaction.
+
+        One executemany and one commit for the whole broadcast instead of
+        an INSERT (and fsync) per recipient.
+        """
+        if not rows:
+            return
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                await db.executemany("""
+                    INSERT INTO broadcast_deliveries (sender_id, user_id, status, error)
+                    VALUES (?, ?, ?, ?)
+                """, [(sender_id, user_id, status, error) for user_id, status, error in rows])
+                await db.commit()
+        except Exception as e:
+            self.logger.error(f"Error saving broadcast deliveries: {e}")
+
     async def add_log(self, user_id: int, action: str, details: str = None):
         """Add entry to logs table"""
         try:
@@ -15,6 +15,7 @@ from keyboards.inline import InlineKeyboards
 from states.registration import ClassManagementStates, BroadcastStates, ForceJoinStates
 from utils.helpers import safe_edit_message, format_stats_text
 from utils.broadcast import BroadcastManager, BroadcastTargetType, BroadcastMessage, extract_message_data
+from middlewares.force_join import ForceJoinMiddleware
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -177,7 +178,8 @@ async def admin_set_force_join_process(message: Message, state: FSMContext, db:
                 channel_username = str(chat.id)
 
         await db.add_force_join_channel(chat.id, channel_username, chat.title)
-        
+        ForceJoinMiddleware.invalidate_channels()
+
         await message.answer(
             f"✅ تم إضافة قناة الاشتراك الإجباري بنجاح!\n"
             f"📢 القناة: {chat.title}",
@@ -203,6 +205,7 @@ async def admin_delete_force_join(callback: CallbackQuery, db: DatabaseManager,
     try:
         channel_db_id = int(callback.data.split("_")[4])
         await db.delete_force_join_channel(channel_db_id)
+        ForceJoinMiddleware.invalidate_channels()
         await callback.answer("✅ تم حذف القناة بنجاح", show_alert=True)
         await admin_force_join_view(callback, db, config, **kwargs)
     except Exception as e:
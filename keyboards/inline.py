@@ -4,39 +4,40 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from typing import List, Dict, Any ,sys
 DEEP_LINKS_ENABLED = False
+
+# Shared static back rows - built once and reused across keyboards.
+# aiogram never mutates rows after markup construction, so sharing is safe.
+_BACK_TO_CLASSES_BTN = InlineKeyboardButton(text="🔙 رجوع", callback_data="back_to_classes")
+_BACK_TO_ADMIN_MENU_ROW = [InlineKeyboardButton(text="🔙 رجوع", callback_data="back_to_admin_menu")]
+_BACK_TO_MANAGER_MENU_ROW = [InlineKeyboardButton(text="🔙 رجوع", callback_data="back_to_manager_menu")]
+_BACK_TO_DASHBOARD_ROW = [InlineKeyboardButton(text="🔙 رجوع", callback_data="admin_dashboard")]
+_BACK_TO_ADMIN_CLASSES_ROW = [InlineKeyboardButton(text="🔙 رجوع", callback_data="admin_classes")]
+
+
 class InlineKeyboards:
     """Class for creating inline keyboards"""
     @staticmethod
     def classes_list(classes: List[Dict[str, Any]]) -> InlineKeyboardMarkup:
         """Create keyboard with list of classes"""
-        buttons = []
-        row: List[InlineKeyboardButton] = []
-        for cls in classes:
-            btn = InlineKeyboardButton(
-                text=cls['class_name'],
-                callback_data=f"class_{cls['class_id']}"
-            )
-            row.append(btn)
-            if len(row) == 2:
-                buttons.append(row)
-                row = []
-        if row:
-            buttons.append(row)
-        buttons.append([InlineKeyboardButton(text="⭐ مفضلتي", callback_data="user_favorites")])
+        # Hot path: bind the constructor locally and pair up buttons two per row.
+        btn = InlineKeyboardButton
+        class_buttons = [
+            btn(text=cls['class_name'], callback_data=f"class_{cls['class_id']}")
+            for cls in classes
+        ]
+        buttons = [class_buttons[i:i + 2] for i in range(0, len(class_buttons), 2)]
+        buttons.append([btn(text="⭐ مفضلتي", callback_data="user_favorites")])
         return InlineKeyboardMarkup(inline_keyboard=buttons)
     
     @staticmethod
     def subjects_list(subjects: List[Dict[str, Any]], class_id: int, current_course: int = 1) -> InlineKeyboardMarkup:
         """Create keyboard with list of subjects"""
-        buttons = []
-        
-        # Build subject buttons
-        for subject in subjects:
-            buttons.append([InlineKeyboardButton(
-                text=subject['subject_name'],
-                callback_data=f"subject_{subject['subject_id']}"
-            )])
-        
+        btn = InlineKeyboardButton
+        buttons = [
+            [btn(text=subject['subject_name'], callback_data=f"subject_{subject['subject_id']}")]
+            for subject in subjects
+        ]
+
         # Bottom row: course toggle + back
         next_course = 2 if current_course == 1 else 1
         course_text = "الثاني" if current_course == 1 else "الأول"
@@ -45,7 +46,7 @@ class InlineKeyboards:
                 text=f"🔄 عرض الكورس {course_text}",
                 callback_data=f"class_{class_id}_{next_course}"
             ),
-            InlineKeyboardButton(text="🔙 رجوع", callback_data="back_to_classes")
+            _BACK_TO_CLASSES_BTN
         ])
         return InlineKeyboardMarkup(inline_keyboard=buttons)
     
@@ -104,8 +105,8 @@ class InlineKeyboards:
                     InlineKeyboardButton(text="🗑️ حذف", callback_data=f"admin_delete_force_join_{channel['id']}")
                 ])
             
-        buttons.append([InlineKeyboardButton(text="🔙 رجوع", callback_data="admin_dashboard")])
-        
+        buttons.append(_BACK_TO_DASHBOARD_ROW)
+
         return InlineKeyboardMarkup(inline_keyboard=buttons)
 
     @staticmethod
@@ -130,7 +131,7 @@ class InlineKeyboards:
                 callback_data=f"admin_class_{cls['class_id']}"
             )])
         
-        buttons.append([InlineKeyboardButton(text="🔙 رجوع", callback_data="back_to_admin_menu")])
+        buttons.append(_BACK_TO_ADMIN_MENU_ROW)
         return InlineKeyboardMarkup(inline_keyboard=buttons)
     
     @staticmethod
@@ -140,7 +141,7 @@ class InlineKeyboards:
             [InlineKeyboardButton(text="👤 تعيين مسؤول", callback_data=f"admin_set_manager_{class_id}")],
             [InlineKeyboardButton(text="🗑️ حذف المرحلة", callback_data=f"admin_delete_class_{class_id}")],
             [InlineKeyboardButton(text="⚙️ إعدادات المرحلة", callback_data=f"admin_settings_{class_id}")],
-            [InlineKeyboardButton(text="🔙 رجوع", callback_data="admin_classes")]
+            _BACK_TO_ADMIN_CLASSES_ROW
         ])
     
     @staticmethod
@@ -171,7 +172,7 @@ class InlineKeyboards:
                 text=cls['class_name'],
                 callback_data=f"manager_class_{cls['class_id']}"
             )])
-        buttons.append([InlineKeyboardButton(text="🔙 رجوع", callback_data="back_to_manager_menu")])
+        buttons.append(_BACK_TO_MANAGER_MENU_ROW)
         return InlineKeyboardMarkup(inline_keyboard=buttons)
     
     @staticmethod
@@ -241,39 +242,25 @@ class InlineKeyboards:
     @staticmethod
     def manager_files_list(files: List[Dict[str, Any]], subject_id: int, class_id: int, file_type: str = 'theory') -> InlineKeyboardMarkup:
         """Manager files list with delete and view options"""
-        buttons = []
-        
+        btn = InlineKeyboardButton
+
         # Add File Button (Context Aware)
         type_text = "نظري" if file_type == 'theory' else "عملي"
-        buttons.append([
-            InlineKeyboardButton(text=f"➕ إضافة ملف {type_text}", callback_data=f"manager_add_file_{subject_id}_{file_type}")
-        ])
-        
-        # Import Group Button
-        buttons.append([
-            InlineKeyboardButton(text="📥 استيراد مجموعة ملفات", callback_data=f"manager_import_group_{subject_id}_{file_type}")
-        ])
+        buttons = [
+            [btn(text=f"➕ إضافة ملف {type_text}", callback_data=f"manager_add_file_{subject_id}_{file_type}")],
+            [btn(text="📥 استيراد مجموعة ملفات", callback_data=f"manager_import_group_{subject_id}_{file_type}")]
+        ]
 
         for file in files:
+            file_id = file['file_id']
             # File name label (non-clickable)
-            buttons.append([
-                InlineKeyboardButton(
-                    text=f"📄 {file['file_name']}",
-                    callback_data="ignore"
-                )
-            ])
+            buttons.append([btn(text=f"📄 {file['file_name']}", callback_data="ignore")])
             # Actions
             buttons.append([
-                InlineKeyboardButton(
-                    text="📤 ارسال",
-                    callback_data=f"download_file_{file['file_id']}"
-                ),
-                InlineKeyboardButton(
-                    text="🗑️ حذف",
-                    callback_data=f"manager_delete_file_{file['file_id']}"
-                )
+                btn(text="📤 ارسال", callback_data=f"download_file_{file_id}"),
+                btn(text="🗑️ حذف", callback_data=f"manager_delete_file_{file_id}")
             ])
-        buttons.append([InlineKeyboardButton(text="🔙 رجوع", callback_data=f"manager_subject_{subject_id}")])
+        buttons.append([btn(text="🔙 رجوع", callback_data=f"manager_subject_{subject_id}")])
         return InlineKeyboardMarkup(inline_keyboard=buttons)
     
     @staticmethod
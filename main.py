@@ -9,6 +9,7 @@ from pathlib import Path
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.enums import ParseMode
 from aiogram.fsm.storage.memory import MemoryStorage
 
@@ -42,9 +43,14 @@ async def main():
             logger.error("❌ Please set your bot token in config.json")
             sys.exit(1)
         
-        # Initialize bot and dispatcher
+        # Initialize bot and dispatcher. The session pool is sized for
+        # broadcast fanout (2x the broadcast concurrency cap) so bursts
+        # reuse warm keep-alive sockets instead of paying a TCP/TLS
+        # handshake per message.
+        session = AiohttpSession(limit=40)
         bot = Bot(
             token=bot_token,
+            session=session,
             default=DefaultBotProperties(parse_mode=ParseMode.HTML)
         )
         
@@ -61,9 +67,12 @@ async def main():
         dp.message.middleware(AuthMiddleware(config))
         dp.callback_query.middleware(AuthMiddleware(config))
         
-        # Setup ForceJoinMiddleware (after Auth to get user info, but before handlers)
-        dp.message.middleware(ForceJoinMiddleware(config))
-        dp.callback_query.middleware(ForceJoinMiddleware(config))
+        # Setup ForceJoinMiddleware as an outer middleware so blocked users
+        # are rejected before filters/FSM resolution run. One shared
+        # instance keeps its caches warm across both observers.
+        force_join_middleware = ForceJoinMiddleware(config)
+        dp.message.outer_middleware(force_join_middleware)
+        dp.callback_query.outer_middleware(force_join_middleware)
         
         # Add bot instance to dispatcher data for middlewares
         dp["bot"] = bot
@@ -6,13 +6,14 @@ from aiogram import BaseMiddleware
 from aiogram.types import Message, CallbackQuery, TelegramObject
 import logging
 
+logger = logging.getLogger(__name__)
+
 
 class AuthMiddleware(BaseMiddleware):
     """Simplified authentication middleware"""
-    
+
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.logger = logging.getLogger(__name__)
         super().__init__()
     
     async def __call__(
@@ -71,6 +72,6 @@ class AuthMiddleware(BaseMiddleware):
             data["managed_classes"] = managed_classes
             
         except Exception as e:
-            self.logger.error(f"❌ Error in auth middleware: {e}")
+            logger.error("❌ Error in auth middleware: %s", e)
         
         return await handler(event, data)
@@ -1,23 +1,91 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from typing import Callable, Dict, Any, Awaitable
+import asyncio
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, Any, Awaitable, NamedTuple, Optional
 from aiogram import BaseMiddleware
+from contextlib import suppress
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
 from aiogram.types import Message, CallbackQuery, TelegramObject, InlineKeyboardMarkup, InlineKeyboardButton
 import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Membership cache tuning: confirmed statuses are reused for this many
+# seconds, and the cache is capped so memory stays bounded.
+MEMBER_CACHE_TTL = 300
+MEMBER_CACHE_MAX_SIZE = 50_000
+
+# The channel list only changes on admin action, so a short TTL saves one
+# DB round-trip per update without admins noticing staleness.
+CHANNELS_CACHE_TTL = 60
+
+class ChannelInfo(NamedTuple):
+    """Frozen, pre-shaped force-join channel record held by the TTL cache"""
+    id: Optional[int]
+    username: Optional[str]
+    title: str
+    link: str
+
+
+# Static prompt fragments - only the per-channel lines vary.
+_FORCE_JOIN_HEADER = "🛑 **عذراً عزيزي**\n\n⚠️ يجب عليك الاشتراك في القنوات التالية لاستخدام البوت:\n\n"
+_FORCE_JOIN_PRIVATE_LINE = "• {title} (قناة خاصة - لا يمكن إنشاء رابط)\n"
+
+
+@lru_cache(maxsize=128)
+def _compute_link(username) -> str:
+    """Derive a joinable t.me link from a stored channel username, if possible.
+
+    Cached: active_channels is rebuilt per event, so after the first event
+    per channel this is a dict lookup instead of string work.
+    """
+    if username:
+        username = str(username)
+        if username.startswith("@"):
+            return f"https://t.me/{username[1:]}"
+        if "t.me" in username:
+            return username
+    return ""
 
 
 class ForceJoinMiddleware(BaseMiddleware):
     """Force join channel middleware"""
-    
+
+    # Store the fixed attribute set in slots so hot-path attribute access
+    # is a slot offset instead of a dict probe. (BaseMiddleware itself is
+    # not slotted, so the empty instance __dict__ remains.)
+    __slots__ = ("config", "force_join_enabled","config_channel_id", "config_channel_username", "_member_cache", "_pending_checks")
+
+    # Shared across instances so admin handlers can invalidate the cache
+    # without holding a reference to the registered middleware.
+    _channels_cache = None
+    _channels_cache_exp = 0.0
+    _channels_lock = asyncio.Lock()
+
+    # (channel ids) -> (text, keyboard). The prompt is identical for every
+    # blocked user with the same missing set, so build it once per set.
+    _message_cache: Dict[tuple, tuple] = {}
+
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.logger = logging.getLogger(__name__)
-        
+
         # Get force join settings from config (static fallback)
+        self.force_join_enabled = config.get("force_join", {}).get("enabled", True)
         self.config_channel_id = config.get("force_join", {}).get("channel_id")
         self.config_channel_username = config.get("force_join", {}).get("channel_username") or config.get("force_join_channel")
 
+        # (chat_id, user_id) -> (status, expiry) so repeat events from the
+        # same user skip the Telegram API round-trip entirely.
+        self._member_cache: OrderedDict = OrderedDict()
+
+        # (chat_id, user_id) -> Future for checks currently in flight, so a
+        # burst of events (button double-taps) shares one API call.
+        self._pending_checks: Dict[tuple, asyncio.Future] = {}
+
     async def __call__(
         self,
         handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
@@ -25,71 +93,89 @@ class ForceJoinMiddleware(BaseMiddleware):
         data: Dict[str, Any],
     ) -> Any:
         
+        # Cheap bypasses first: events without a user (channel posts,
+        # chat_member updates, ...), disabled enforcement and superadmins
+        # never need the channel list, so none of them cost any DB work.
+        user = getattr(event, "from_user", None)
+        if user is None:
+            return await handler(event, data)
+
+        if not self.force_join_enabled:
+            return await handler(event, data)
+
+        # As an outer middleware this runs before AuthMiddleware, so auth
+        # flags like data["is_superadmin"] are not populated yet - the
+        # config id is the only superadmin source available this early.
+        if user.id == self.config.get("superadmin_id"):
+            return await handler(event, data)
+
         # Get DB manager
         db = data.get("db")
         if not db:
             return await handler(event, data)
 
-        # 1. Get channels from DB
-        db_channels = await db.get_force_join_channels()
-        
-        # 2. Prepare active channels list
-        active_channels = []
-        if db_channels:
-            for ch in db_channels:
-                active_channels.append({
-                    'id': ch['channel_id'],
-                    'username': ch['channel_username'],
-                    'title': ch['channel_title'] or "قناة"
-                })
-        else:
-             # Fallback to old config if DB is empty
-             config_id = self.config_channel_id
-             config_username = self.config_channel_username
-             if config_id or config_username:
-                 active_channels.append({
-                     'id': config_id,
-                     'username': config_username,
-                     'title': "قناة البوت"
-                 })
-        
+        # Regular group chatter must not cost a DB query plus N API calls:
+        # only private chats, commands/mentions and callbacks are enforced.
+        if isinstance(event, Message) and event.chat.type != "private":
+            text = event.text
+            if not (text and text[0] in "/@"):
+                return await handler(event, data)
+
+        # Get the active channels, already shaped into frozen records by
+        # the TTL cache - no per-event dict building.
+        active_channels = await self._get_channels(db)
+
         if not active_channels:
             return await handler(event, data)
-        
-        # Get user
-        user = None
-        if isinstance(event, Message):
-            user = event.from_user
-        elif isinstance(event, CallbackQuery):
-            user = event.from_user
-        
-        if not user:
-            return await handler(event, data)
-        
-        # Skip for superadmins
-        is_superadmin = data.get("is_superadmin", False)
-        if is_superadmin:
-            return await handler(event, data)
-        
+
         # Enforce for ALL interactions
         bot = data.get("bot")
         if not bot:
             return await handler(event, data)
         
+        # The "✅ تم الاشتراك" button must re-check for real, so drop any
+        # cached statuses for this user before verifying.
+        if isinstance(event, CallbackQuery) and event.data == "check_membership":
+            self._invalidate_user_cache(user.id)
+
         missing_channels = []
-        
+        now = time.monotonic()
+        to_check = []
+
         for channel in active_channels:
-            try:
-                # Prefer ID if available
-                chat_id = channel['id'] if channel['id'] else channel['username']
-                member = await bot.get_chat_member(chat_id, user.id)
-                if member.status in ["left", "kicked"]:
+            # Prefer ID if available
+            chat_id = channel.id if channel.id else channel.username
+            cached = self._member_cache.get((chat_id, user.id))
+            if cached and cached[1] > now:
+                if cached[0] in ["left", "kicked"]:
+                    missing_channels.append(channel)
+            else:
+                to_check.append((channel, chat_id))
+
+        if to_check:
+            # Issue all cache-miss checks concurrently so total latency is
+            # the slowest round-trip, not the sum of them. Shielded so a
+            # cancelled event (double-tap retries) still lets the batch
+            # finish and populate the cache instead of re-hitting the API.
+            results = await asyncio.shield(asyncio.gather(
+                *[self._get_member_status(bot, chat_id, user.id) for _, chat_id in to_check],
+                return_exceptions=True
+            ))
+            for (channel, chat_id), result in zip(to_check, results):
+                if isinstance(result, (TelegramBadRequest, TelegramForbiddenError)):
+                    # Expected failures (bot kicked, member list inaccessible,
+                    # bad user id) - no string matching needed, the exception
+                    # type already classifies them. Assume not a member.
+                    logger.warning("Cannot verify membership for %s: %s", channel, result)
+                    missing_channels.append(channel)
+                    continue
+                if isinstance(result, Exception):
+                    logger.warning("Failed to check membership for %s: %s", channel, result)
+                    # To be safe, if we can't check, we assume they are not a member.
+                    missing_channels.append(channel)
+                    continue
+                if result in ["left", "kicked"]:
                     missing_channels.append(channel)
-            except Exception as e:
-                self.logger.warning(f"Failed to check membership for {channel}: {e}")
-                # To be safe, if we can't check, we assume they are not a member.
-                missing_channels.append(channel)
-                continue
 
         if not missing_channels:
             # User is subscribed to all channels, proceed with the original handler
@@ -102,40 +188,134 @@ class ForceJoinMiddleware(BaseMiddleware):
             await self._send_force_join_message(event, user, bot, missing_channels)
             return
     
-    async def _send_force_join_message(self, event, user, bot, channels):
-        """Send force join message to user"""
-        
-        text = "🛑 **عذراً عزيزي**\n\n⚠️ يجب عليك الاشتراك في القنوات التالية لاستخدام البوت:\n\n"
-        
+    async def _get_channels(self, db):
+        """Return the active channels as frozen ChannelInfo records,
+        refreshing from the DB at most once per TTL"""
+        cls = type(self)
+        if time.monotonic() < cls._channels_cache_exp:
+            return cls._channels_cache
+        async with cls._channels_lock:
+            # Re-check under the lock so concurrent expiries refresh once
+            if time.monotonic() < cls._channels_cache_exp:
+                return cls._channels_cache
+
+            db_channels = await db.get_force_join_channels()
+            if db_channels:
+                channels = tuple(
+                    ChannelInfo(
+                        id=ch['channel_id'],
+                        username=ch['channel_username'],
+                        title=ch['channel_title'] or "قناة",
+                        link=_compute_link(ch['channel_username'])
+                    )
+                    for ch in db_channels
+                )
+            elif self.config_channel_id or self.config_channel_username:
+                # Fallback to old config if DB is empty
+                channels = (ChannelInfo(
+                    id=self.config_channel_id,
+                    username=self.config_channel_username,
+                    title="قناة البوت",
+                    link=_compute_link(self.config_channel_username)
+                ),)
+            else:
+                channels = ()
+
+            cls._channels_cache = channels
+            cls._channels_cache_exp = time.monotonic() + CHANNELS_CACHE_TTL
+            cls._message_cache.clear()
+        return cls._channels_cache
+
+    @classmethod
+    def invalidate_channels(cls):
+        """Force a refresh on the next update (called after admin add/delete)"""
+        cls._channels_cache_exp = 0.0
+        cls._message_cache.clear()
+
+    async def _get_member_status(self, bot, chat_id, user_id: int) -> str:
+        """Fetch a membership status, coalescing concurrent calls for the
+        same (channel, user) tuple into a single API round-trip"""
+        key = (chat_id, user_id)
+        pending = self._pending_checks.get(key)
+        if pending is not None:
+            return await pending
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending_checks[key] = future
+        try:
+            member = await bot.get_chat_member(chat_id, user_id)
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an un-awaited future doesn't warn
+            future.exception()
+            raise
+        else:
+            # Cache here (inside the shielded batch) so the result lands
+            # even when the originating event has been cancelled.
+            self._cache_member_status(chat_id, user_id, member.status)
+            future.set_result(member.status)
+            return member.status
+        finally:
+            del self._pending_checks[key]
+
+    def _cache_member_status(self, chat_id, user_id: int, status: str):
+        """Store a membership status with TTL, evicting oldest entries past the cap"""
+        cache = self._member_cache
+        cache[(chat_id, user_id)] = (status, time.monotonic() + MEMBER_CACHE_TTL)
+        cache.move_to_end((chat_id, user_id))
+        while len(cache) > MEMBER_CACHE_MAX_SIZE:
+            cache.popitem(last=False)
+
+    def _invalidate_user_cache(self, user_id: int):
+        """Drop all cached statuses for a user (after they claim to have joined)"""
+        stale = [key for key in self._member_cache if key[1] == user_id]
+        for key in stale:
+            del self._member_cache[key]
+
+    def _build_force_join_content(self, channels):
+        """Build the prompt text and keyboard for a set of missing channels"""
+        parts = [_FORCE_JOIN_HEADER]
         keyboard_rows = []
-        
+
         for ch in channels:
-            title = ch['title']
-            link = ""
-            username = ch['username']
-            
-            if username and str(username).startswith("@"):
-                 link = f"https://t.me/{username[1:]}"
-            elif username and "t.me" in str(username):
-                 link = str(username)
-            
+            title = ch.title
+            link = ch.link
+
             if link:
                 keyboard_rows.append([InlineKeyboardButton(text=f"📢 {title}", url=link)])
             else:
-                text += f"• {title} (قناة خاصة - لا يمكن إنشاء رابط)\n"
+                parts.append(_FORCE_JOIN_PRIVATE_LINE.format(title=title))
 
         keyboard_rows.append([InlineKeyboardButton(text="✅ تم الاشتراك", callback_data="check_membership")])
-        
-        keyboard = InlineKeyboardMarkup(inline_keyboard=keyboard_rows)
-        
+
+        return "".join(parts), InlineKeyboardMarkup(inline_keyboard=keyboard_rows)
+
+    async def _send_force_join_message(self, event, user, bot, channels):
+        """Send force join message to user"""
+
+        # The prompt only depends on which channels are missing, so reuse
+        # the built text/markup across users until the config changes.
+        cache_key = tuple(ch.id or ch.username for ch in channels)
+        cached = self._message_cache.get(cache_key)
+        if cached is None:
+            cached = self._message_cache[cache_key] = self._build_force_join_content(channels)
+        text, keyboard = cached
+
         # We try to answer the original message/callback with the force-join prompt.
         if isinstance(event, Message):
-            try:
-                await event.answer(text, reply_markup=keyboard)
-            except Exception:
-                pass
+            target = event
         elif isinstance(event, CallbackQuery):
-            try:
-                await event.message.answer(text, reply_markup=keyboard)
-            except Exception:
-                pass
+            target = event.message
+        else:
+            return
+
+        try:
+            await target.answer(text, reply_markup=keyboard)
+        except TelegramRetryAfter as e:
+            # Honor the 429 window instead of swallowing it, then retry once.
+            await asyncio.sleep(e.retry_after)
+            with suppress(TelegramAPIError):
+                await target.answer(text, reply_markup=keyboard)
+        except TelegramAPIError:
+            # Can't message this user (blocked bot, deleted chat, ...).
+            pass
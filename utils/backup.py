@@ -5,19 +5,71 @@
 Automatic Backup System
 """
 
+import functools
+import hashlib
+import io
 import os
+import shlex
 import shutil
-import gzip
+import sqlite3
+import subprocess
+import tarfile
+import time
 import json
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Pick the external compressor once at import. zstd is multi-threaded and
+# much faster than in-process gzip; pigz parallelizes gzip. When neither
+# is installed we fall back to Python's tarfile.
+if shutil.which("zstd"):
+    _COMPRESSOR = "zstd"
+    BACKUP_SUFFIX = ".tar.zst"
+elif shutil.which("pigz"):
+    _COMPRESSOR = "pigz"
+    BACKUP_SUFFIX = ".tar.gz"
+else:
+    _COMPRESSOR = None
+    BACKUP_SUFFIX = ".tar.gz"
+
+# tarfile defaults to 16 KiB blocks; 2 MiB cuts the syscall count on a
+# large DB file by two orders of magnitude.
+TAR_BUFSIZE = 2 * 1024 * 1024
+
+# Already-compressed rotations gain nothing from another pass through the
+# compressor - keep them out of the archive stream.
+_PRECOMPRESSED_SUFFIXES = ('.gz', '.zst', '.xz', '.bz2')
+
+
+def _is_backup_name(name: str) -> bool:
+    """Match archive names produced by BackupManager (.tar.gz / .tar.zst)"""
+    return name.startswith("school_bot_backup_") and ".tar." in name
+
+
+def _fast_copy(src, dst):
+    """Copy a file with os.sendfile so bytes stay in the kernel,
+    falling back to shutil.copy2 where sendfile is unavailable"""
+    if not hasattr(os, "sendfile"):
+        shutil.copy2(src, dst)
+        return
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        offset = 0
+        while remaining > 0:
+            sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, remaining)
+            if sent == 0:
+                break
+            offset += sent
+            remaining -= sent
+    shutil.copystat(src, dst)
+
 
 class BackupManager:
     """نسْخَھِ احتياطيه تلقائيه"""
@@ -32,8 +84,26 @@ class BackupManager:
         self.auto_backup = self.backup_settings.get("auto_backup", True)
         self.interval_hours = self.backup_settings.get("interval_hours", 24)
         self.keep_days = self.backup_settings.get("keep_days", 30)
-        
+
+        # Optional restic backend: encrypted, deduplicated snapshots with
+        # retention handled by restic itself. The native tar pipeline stays
+        # the default and the fallback when restic is not installed.
+        self.backend = self.backup_settings.get("backend", "native")
+        if self.backend == "restic" and not shutil.which("restic"):
+            logger.warning("restic backend requested but restic is not installed, using native backend")
+            self.backend = "native"
+        self.restic_repo = self.backup_settings.get("restic_repository", str(self.backup_dir / "restic-repo"))
+        self.restic_password = self.backup_settings.get("restic_password", "")
+
+        # Dedicated executor for blocking file ops: backup bursts stay off
+        # the loop's default pool, so they cannot starve unrelated work.
+        self._pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="backup-io")
+
         self.running = False
+
+    def _run_io(self, fn, *args):
+        """Dispatch a blocking call onto the dedicated backup-io pool"""
+        return asyncio.get_running_loop().run_in_executor(self._pool, functools.partial(fn, *args))
     
     async def start_auto_backup(self):
         """بدء النسخه الاحتياطيه"""
@@ -43,105 +113,246 @@ class BackupManager:
         
         self.running = True
         logger.info(f"🔄 Auto backup started (interval: {self.interval_hours}h)")
-        
+
+        loop = asyncio.get_running_loop()
+        interval = self.interval_hours * 3600
+        next_run = loop.time()
+
         while self.running:
             try:
                 await self.create_backup()
                 await self.cleanup_old_backups()
-                
-                await asyncio.sleep(self.interval_hours * 3600)
-                
+
+                # Drift-free cadence: schedule from the previous deadline,
+                # not from whenever the backup happened to finish.
+                next_run += interval
+                await asyncio.sleep(max(0.0, next_run - loop.time()))
+
             except Exception as e:
                 logger.error(f"Error in auto backup: {e}")
                 await asyncio.sleep(300)  # 5 minutes wait on error
+                next_run = loop.time()
     
     def stop_auto_backup(self):
         """ايقاف النسخه الاحتياطيه"""
         self.running = False
+        self._pool.shutdown(wait=False, cancel_futures=True)
         logger.info("⏹️ Auto backup stopped")
     
     async def create_backup(self, backup_type: str = "auto") -> str:
         """نسْخَھِ احتياطيه جديده"""
+        if self.backend == "restic":
+            return await self._create_restic_backup()
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            now = datetime.now()
+            timestamp = now.strftime("%Y%m%d_%H%M%S")
             backup_name = f"school_bot_backup_{backup_type}_{timestamp}"
-            backup_path = self.backup_dir / backup_name
-            backup_path.mkdir(exist_ok=True)
-            
+            compressed_path = self.backup_dir / (backup_name + BACKUP_SUFFIX)
+
+            # The fingerprint read and the SQLite snapshot touch disjoint
+            # files, so run both prep jobs concurrently - their I/O overlaps
+            # instead of queueing behind each other.
+            fingerprint, snapshot_path = await asyncio.gather(
+                self._run_io(self._source_fingerprint),
+                self._run_io(self._snapshot_database),
+            )
+
+            # Daily auto backups of an unchanged DB/config are pure waste;
+            # skip them when the source fingerprint matches the last run.
+            if backup_type == "auto":
+                last = self._read_last_fingerprint()
+                if last and last.get("hash") == fingerprint and Path(last.get("path", "")).exists():
+                    logger.info("⏭️ Source unchanged since last backup, skipping")
+                    if snapshot_path:
+                        snapshot_path.unlink(missing_ok=True)
+                    return last["path"]
+
             logger.info(f"📦 Creating backup: {backup_name}")
-            
-            await self._backup_database(backup_path)
-            
-            await self._backup_config(backup_path)
-            
-            await self._backup_logs(backup_path)
-            
-            await self._create_backup_info(backup_path, backup_type)
-            
-            compressed_path = await self._compress_backup(backup_path)
-            
-            shutil.rmtree(backup_path)
-            
+
+            # One thread hop for the whole archive build keeps the event
+            # loop responsive for the duration of the backup.
+            await self._run_io(self._write_archive, compressed_path, backup_name, backup_type, now, snapshot_path)
+
+            self._write_last_fingerprint(fingerprint, str(compressed_path))
+
             logger.info(f"✅ Backup created: {compressed_path.name}")
             return str(compressed_path)
-            
+
         except Exception as e:
             logger.error(f"❌ Error creating backup: {e}")
             raise
-    
-    async def _backup_database(self, backup_path: Path):
-        """نسْخَھِ احتياطيه من الخزن"""
+
+    def _source_fingerprint(self) -> str:
+        """SHA-256 over the DB and config contents (logs are excluded -
+        they change every run and are only a convenience in the archive)
+
+        The -wal sidecar is hashed too: with journal_mode=WAL, recent
+        commits live there until a checkpoint, and ignoring it would let
+        the auto-backup skip on a database that has in fact changed.
+        """
+        digest = hashlib.sha256()
+        db_path = self.config.get("database_path", "school_bot.db")
+        for source in (db_path, f"{db_path}-wal", "config.json"):
+            path = Path(source)
+            if path.exists():
+                with open(path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                        digest.update(chunk)
+        return digest.hexdigest()
+
+    def _read_last_fingerprint(self) -> Dict[str, Any]:
+        try:
+            with open(self.backup_dir / ".last_backup.json", 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_last_fingerprint(self, fingerprint: str, path: str):
+        try:
+            with open(self.backup_dir / ".last_backup.json", 'w', encoding='utf-8') as f:
+                json.dump({"hash": fingerprint, "path": path}, f)
+        except OSError as e:
+            logger.error(f"Error writing backup fingerprint: {e}")
+
+    def _snapshot_database(self) -> Optional[Path]:
+        """Take a consistent snapshot of the live database.
+
+        SQLite's online-backup API takes proper page locks, so the snapshot
+        is consistent even while the bot is writing - a raw file copy could
+        catch a torn page mid-transaction.
+        """
         try:
             db_path = Path(self.config.get("database_path", "school_bot.db"))
-            if db_path.exists():
-                target_path = backup_path / "database"
-                target_path.mkdir(exist_ok=True)
-                
-                shutil.copy2(db_path, target_path / db_path.name)
-                logger.debug(f"Database backed up: {db_path.name}")
+            if not db_path.exists():
+                return None
+
+            snapshot_path = self.backup_dir / (db_path.name + ".snapshot")
+            src = sqlite3.connect(db_path)
+            try:
+                dst = sqlite3.connect(snapshot_path)
+                try:
+                    src.backup(dst, pages=1024)
+                finally:
+                    dst.close()
+            finally:
+                src.close()
+            return snapshot_path
+        except Exception as e:
+            logger.error(f"Error snapshotting database: {e}")
+            return None
+
+    def _write_archive(self, compressed_path: Path, backup_name: str, backup_type: str, now: datetime,
+                       snapshot_path: Optional[Path] = None):
+        """Stream every member straight into the compressed archive.
+
+        No staging directory: each byte is written to disk exactly once,
+        and there is nothing to rmtree afterwards. With an external
+        compressor the tar stream is piped into its stdin.
+        """
+        if _COMPRESSOR:
+            args = ["zstd", "-T0", "-6", "-q"] if _COMPRESSOR == "zstd" else ["pigz", "-6"]
+            with open(compressed_path, 'wb') as out:
+                proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=out,
+                                        stderr=subprocess.PIPE)
+                try:
+                    with tarfile.open(fileobj=proc.stdin, mode='w|', bufsize=TAR_BUFSIZE) as tar:
+                        self._add_members(tar, backup_name, backup_type, now, snapshot_path)
+                except BrokenPipeError:
+                    # The compressor died mid-stream; its exit code and
+                    # stderr below say why.
+                    pass
+                finally:
+                    try:
+                        proc.stdin.close()
+                    except BrokenPipeError:
+                        pass
+                    stderr = proc.stderr.read()
+                    proc.stderr.close()
+                    returncode = proc.wait()
+            if returncode != 0:
+                # Never leave a truncated archive behind for list/restore.
+                compressed_path.unlink(missing_ok=True)
+                detail = stderr.decode(errors="replace").strip()
+                raise RuntimeError(
+                    f"Compression pipeline failed with code {returncode}"
+                    + (f": {detail}" if detail else "")
+                )
+        else:
+            # Level 6 is ~30-40% faster than the default 9 for <1% size
+            # growth on this kind of data.
+            with tarfile.open(compressed_path, 'w:gz', compresslevel=6, bufsize=TAR_BUFSIZE) as tar:
+                self._add_members(tar, backup_name, backup_type, now, snapshot_path)
+
+    def _add_members(self, tar: tarfile.TarFile, backup_name: str, backup_type: str, now: datetime,
+                     snapshot_path: Optional[Path]):
+        """اضافة محتويات النسخه الاحتياطيه"""
+        self._backup_database(tar, backup_name, snapshot_path)
+        self._backup_config(tar, backup_name)
+        self._backup_logs(tar, backup_name, now)
+        self._create_backup_info(tar, backup_name, backup_type, now)
+
+    def _backup_database(self, tar: tarfile.TarFile, backup_name: str, snapshot_path: Optional[Path]):
+        """نسْخَھِ احتياطيه من الخزن"""
+        try:
+            if not snapshot_path:
+                return
+            db_name = self.config.get("database_path", "school_bot.db")
+            db_name = Path(db_name).name
+
+            try:
+                tar.add(snapshot_path, arcname=f"{backup_name}/database/{db_name}")
+            finally:
+                snapshot_path.unlink(missing_ok=True)
+            logger.debug(f"Database backed up: {db_name}")
         except Exception as e:
             logger.error(f"Error backing up database: {e}")
-    
-    async def _backup_config(self, backup_path: Path):
+
+    def _backup_config(self, tar: tarfile.TarFile, backup_name: str):
         """نسْخَھِ احتياطيه من المعلومات الكونفينك"""
         try:
             config_files = ["config.json", "config.example.json"]
-            target_path = backup_path / "config"
-            target_path.mkdir(exist_ok=True)
-            
+
             for config_file in config_files:
                 config_path = Path(config_file)
                 if config_path.exists():
-                    shutil.copy2(config_path, target_path / config_file)
+                    tar.add(config_path, arcname=f"{backup_name}/config/{config_file}")
                     logger.debug(f"Config backed up: {config_file}")
         except Exception as e:
             logger.error(f"Error backing up config: {e}")
-    
-    async def _backup_logs(self, backup_path: Path):
+
+    def _backup_logs(self, tar: tarfile.TarFile, backup_name: str, now: datetime):
         """نسْخَھِ من الاخطاء"""
         try:
             logs_dir = Path("logs")
             if logs_dir.exists():
-                target_path = backup_path / "logs"
-                target_path.mkdir(exist_ok=True)
-                
                 # فقط لاگ‌های 7 روز اخیر
-                cutoff_date = datetime.now() - timedelta(days=7)
-                
-                for log_file in logs_dir.glob("*.log"):
-                    file_time = datetime.fromtimestamp(log_file.stat().st_mtime)
-                    if file_time > cutoff_date:
-                        shutil.copy2(log_file, target_path / log_file.name)
-                        logger.debug(f"Log backed up: {log_file.name}")
+                cutoff_ts = (now - timedelta(days=7)).timestamp()
+
+                # Single scandir pass with cached stats - no extra stat()
+                # syscall or datetime allocation per file.
+                with os.scandir(logs_dir) as entries:
+                    for entry in entries:
+                        # Compressed rotations (*.log.gz etc.) are skipped:
+                        # re-compressing them in the archive stream costs
+                        # CPU for no size gain.
+                        if entry.name.endswith(_PRECOMPRESSED_SUFFIXES):
+                            continue
+                        # Matches both active files (name.log) and rotated
+                        # days (name.2026-08-31.log / legacy name.log.date)
+                        if '.log' not in entry.name:
+                            continue
+                        if entry.stat().st_mtime > cutoff_ts:
+                            tar.add(entry.path, arcname=f"{backup_name}/logs/{entry.name}")
+                            logger.debug(f"Log backed up: {entry.name}")
         except Exception as e:
             logger.error(f"Error backing up logs: {e}")
-    
-    async def _create_backup_info(self, backup_path: Path, backup_type: str):
+
+    def _create_backup_info(self, tar: tarfile.TarFile, backup_name: str, backup_type: str, now: datetime):
         """نسْخَھِ احتياطيه من المعلومات"""
         try:
             info = {
                 "backup_type": backup_type,
-                "created_at": datetime.now().isoformat(),
+                "created_at": now.isoformat(),
                 "bot_version": "1.0.0",
                 "python_version": f"{os.sys.version_info.major}.{os.sys.version_info.minor}",
                 "files_included": {
@@ -149,44 +360,99 @@ class BackupManager:
                     "config": True,
                     "logs": True
                 },
-                "notes": f"Automatic backup created at {datetime.now()}"
+                "notes": f"Automatic backup created at {now}"
             }
-            
-            info_path = backup_path / "backup_info.json"
-            with open(info_path, 'w', encoding='utf-8') as f:
-                json.dump(info, f, ensure_ascii=False, indent=2)
-                
+
+            # Compact encoding - the file is machine-read on restore, so
+            # pretty-printing only doubles its size.
+            data = json.dumps(info, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            member = tarfile.TarInfo(f"{backup_name}/backup_info.json")
+            member.size = len(data)
+            member.mtime = int(now.timestamp())
+            tar.addfile(member, io.BytesIO(data))
+
         except Exception as e:
             logger.error(f"Error creating backup info: {e}")
     
-    async def _compress_backup(self, backup_path: Path) -> Path:
-        """ضغط النسخه الاحتياطيه"""
-        try:
-            compressed_path = backup_path.with_suffix('.tar.gz')
-            
-            import tarfile
-            with tarfile.open(compressed_path, 'w:gz') as tar:
-                tar.add(backup_path, arcname=backup_path.name)
-            
-            return compressed_path
-            
-        except Exception as e:
-            logger.error(f"Error compressing backup: {e}")
-            raise
-    
+    def _restic_env(self) -> Dict[str, str]:
+        env = os.environ.copy()
+        env["RESTIC_REPOSITORY"] = self.restic_repo
+        env["RESTIC_PASSWORD"] = self.restic_password
+        return env
+
+    async def _restic(self, *args: str) -> bytes:
+        """Run a restic subcommand, raising on a non-zero exit"""
+        proc = await asyncio.create_subprocess_exec(
+            "restic", *args,
+            env=self._restic_env(),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            detail = stderr.decode(errors="replace").strip()
+            raise RuntimeError(f"restic {args[0]} failed with code {proc.returncode}: {detail}")
+        return stdout
+
+    async def _create_restic_backup(self) -> str:
+        """Snapshot the sources into the restic repository.
+
+        restic deduplicates at the chunk level and compresses in parallel,
+        so unchanged data costs almost nothing - no fingerprint skip needed.
+        """
+        if not (Path(self.restic_repo) / "config").exists():
+            await self._restic("init")
+
+        sources = [self.config.get("database_path", "school_bot.db"), "config.json"]
+        if Path("logs").exists():
+            sources.append("logs")
+        await self._restic("backup", *[s for s in sources if Path(s).exists()])
+
+        logger.info("✅ restic snapshot created")
+        return self.restic_repo
+
+    @staticmethod
+    def _extract_archive(backup_file: Path, temp_dir: Path):
+        """Blocking tar extraction - runs on a worker thread"""
+        with tarfile.open(backup_file, 'r:gz', bufsize=TAR_BUFSIZE) as tar:
+            tar.extractall(temp_dir)
+
     async def cleanup_old_backups(self):
         """مسح النسخ الاحتياطيه القديمه"""
+        if self.backend == "restic":
+            # restic owns retention: drop snapshots past the window and
+            # reclaim the space their unique chunks held.
+            try:
+                await self._restic("forget", "--keep-daily", str(self.keep_days), "--prune")
+            except Exception as e:
+                logger.error(f"Error cleaning up old backups: {e}")
+            return
         try:
-            cutoff_date = datetime.now() - timedelta(days=self.keep_days)
+            cutoff_ts = (datetime.now() - timedelta(days=self.keep_days)).timestamp()
             removed_count = 0
-            
-            for backup_file in self.backup_dir.glob("school_bot_backup_*.tar.gz"):
-                file_time = datetime.fromtimestamp(backup_file.stat().st_mtime)
-                if file_time < cutoff_date:
-                    backup_file.unlink()
-                    removed_count += 1
-                    logger.debug(f"Removed old backup: {backup_file.name}")
-            
+
+            # One scandir pass: DirEntry.stat() reuses metadata from the
+            # directory read instead of issuing a stat() per file.
+            with os.scandir(self.backup_dir) as entries:
+                victims = [
+                    Path(entry.path)
+                    for entry in entries
+                    if _is_backup_name(entry.name) and entry.stat().st_mtime < cutoff_ts
+                ]
+
+            if victims:
+                # Delete concurrently; the semaphore keeps the burst from
+                # starving other I/O on the shared thread pool.
+                semaphore = asyncio.Semaphore(32)
+
+                async def _unlink(path: Path):
+                    async with semaphore:
+                        await self._run_io(path.unlink)
+                        logger.debug(f"Removed old backup: {path.name}")
+
+                await asyncio.gather(*[_unlink(path) for path in victims])
+                removed_count = len(victims)
+
             if removed_count > 0:
                 logger.info(f"🗑️ Cleaned up {removed_count} old backups")
                 
@@ -196,6 +462,8 @@ class BackupManager:
     async def restore_backup(self, backup_path: str, restore_database: bool = True, 
                            restore_config: bool = False) -> bool:
         """استعادة النسخه الاحتياطيه"""
+        if self.backend == "restic":
+            return await self._restore_restic_backup(restore_database, restore_config)
         try:
             backup_file = Path(backup_path)
             if not backup_file.exists():
@@ -208,10 +476,19 @@ class BackupManager:
             temp_dir.mkdir(exist_ok=True)
             
             try:
-                import tarfile
-                with tarfile.open(backup_file, 'r:gz') as tar:
-                    tar.extractall(temp_dir)
-                
+                if backup_file.name.endswith(".tar.zst"):
+                    pipeline = (
+                        f"zstd -d -c {shlex.quote(str(backup_file))}"
+                        f" | tar -x -C {shlex.quote(str(temp_dir))}"
+                    )
+                    proc = await asyncio.create_subprocess_shell(pipeline)
+                    returncode = await proc.wait()
+                    if returncode != 0:
+                        logger.error(f"Extraction pipeline failed with code {returncode}")
+                        return False
+                else:
+                    await self._run_io(self._extract_archive, backup_file, temp_dir)
+
                 extracted_dirs = list(temp_dir.glob("school_bot_backup_*"))
                 if not extracted_dirs:
                     logger.error("No backup data found in archive")
@@ -232,12 +509,46 @@ class BackupManager:
             finally:
                 # پاک کردن پوشه موقت
                 if temp_dir.exists():
-                    shutil.rmtree(temp_dir)
+                    await self._run_io(shutil.rmtree, temp_dir)
                     
         except Exception as e:
             logger.error(f"❌ Error restoring backup: {e}")
             return False
     
+    async def _restore_restic_backup(self, restore_database: bool, restore_config: bool) -> bool:
+        """Restore the latest restic snapshot into place"""
+        temp_dir = self.backup_dir / "temp_restore"
+        try:
+            await self._restic("restore", "latest", "--target", str(temp_dir))
+
+            # restic recreates the original paths under the target, so
+            # locate the files instead of assuming the layout.
+            if restore_database:
+                db_name = Path(self.config.get("database_path", "school_bot.db")).name
+                found = next(iter(temp_dir.rglob(db_name)), None)
+                if found:
+                    target_path = Path(self.config.get("database_path", "school_bot.db"))
+                    if target_path.exists():
+                        backup_current = target_path.with_suffix(f".db.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+                        await self._run_io(_fast_copy, target_path, backup_current)
+                    await self._run_io(_fast_copy, found, target_path)
+                    logger.info("Database restored from restic snapshot")
+
+            if restore_config:
+                found = next(iter(temp_dir.rglob("config.json")), None)
+                if found:
+                    await self._run_io(_fast_copy, found, Path("config.json"))
+                    logger.info("Config restored from restic snapshot")
+
+            logger.info("✅ Backup restored successfully")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Error restoring backup: {e}")
+            return False
+        finally:
+            if temp_dir.exists():
+                await self._run_io(shutil.rmtree, temp_dir)
+
     async def _restore_database(self, backup_data_dir: Path):
         """استعادة قاعدة البيانات"""
         try:
@@ -251,11 +562,11 @@ class BackupManager:
                     # بکاپ از فایل فعلی
                     if target_path.exists():
                         backup_current = target_path.with_suffix(f".db.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
-                        shutil.copy2(target_path, backup_current)
+                        await self._run_io(_fast_copy, target_path, backup_current)
                         logger.info(f"Current database backed up to: {backup_current.name}")
-                    
+
                     # بازیابی پایگاه داده
-                    shutil.copy2(db_file, target_path)
+                    await self._run_io(_fast_copy, db_file, target_path)
                     logger.info("Database restored from backup")
         except Exception as e:
             logger.error(f"Error restoring database: {e}")
@@ -272,31 +583,48 @@ class BackupManager:
                     # بکاپ از فایل فعلی
                     if target_path.exists():
                         backup_current = target_path.with_suffix(f".json.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
-                        shutil.copy2(target_path, backup_current)
-                    
+                        await self._run_io(_fast_copy, target_path, backup_current)
+
                     # بازیابی کانفیگ
-                    shutil.copy2(config_file, target_path)
+                    await self._run_io(_fast_copy, config_file, target_path)
                     logger.info(f"Config restored: {config_file.name}")
         except Exception as e:
             logger.error(f"Error restoring config: {e}")
     
+    def _scan_backups(self):
+        """Yield (mtime, size) for every archive in one scandir pass"""
+        with os.scandir(self.backup_dir) as entries:
+            for entry in entries:
+                if _is_backup_name(entry.name):
+                    file_stat = entry.stat()
+                    yield file_stat.st_mtime, file_stat.st_size
+
     def list_backups(self) -> List[Dict[str, Any]]:
         """قائمة النسخ الاحتياطيه الموجوده"""
         try:
             backups = []
-            
-            for backup_file in sorted(self.backup_dir.glob("school_bot_backup_*.tar.gz"), reverse=True):
-                file_stat = backup_file.stat()
+            now_ts = time.time()
+
+            with os.scandir(self.backup_dir) as entries:
+                found = sorted(
+                    ((entry.name, entry.path, entry.stat()) for entry in entries
+                     if _is_backup_name(entry.name)),
+                    reverse=True
+                )
+
+            for name, path, file_stat in found:
+                # Age comes from integer epoch arithmetic; the datetime is
+                # built once per entry only because callers display it.
                 backup_info = {
-                    "filename": backup_file.name,
-                    "path": str(backup_file),
+                    "filename": name,
+                    "path": path,
                     "size": file_stat.st_size,
                     "size_mb": round(file_stat.st_size / 1024 / 1024, 2),
                     "created_at": datetime.fromtimestamp(file_stat.st_mtime),
-                    "age_days": (datetime.now() - datetime.fromtimestamp(file_stat.st_mtime)).days
+                    "age_days": int((now_ts - file_stat.st_mtime) // 86400)
                 }
                 backups.append(backup_info)
-            
+
             return backups
             
         except Exception as e:
@@ -306,14 +634,22 @@ class BackupManager:
     def get_backup_stats(self) -> Dict[str, Any]:
         """احصائيات النسخ الاحتياطيه"""
         try:
-            backups = self.list_backups()
-            total_size = sum(b["size"] for b in backups)
-            
+            # Fold the directory scan directly: no intermediate list of
+            # per-backup dicts just to sum sizes and find the extremes.
+            count = 0
+            total_size = 0
+            oldest = newest = None
+            for mtime, size in self._scan_backups():
+                count += 1
+                total_size += size
+                oldest = mtime if oldest is None else min(oldest, mtime)
+                newest = mtime if newest is None else max(newest, mtime)
+
             return {
-                "total_backups": len(backups),
+                "total_backups": count,
                 "total_size_mb": round(total_size / 1024 / 1024, 2),
-                "oldest_backup": backups[-1]["created_at"] if backups else None,
-                "newest_backup": backups[0]["created_at"] if backups else None,
+                "oldest_backup": datetime.fromtimestamp(oldest) if oldest is not None else None,
+                "newest_backup": datetime.fromtimestamp(newest) if newest is not None else None,
                 "auto_backup_enabled": self.auto_backup,
                 "backup_interval_hours": self.interval_hours,
                 "keep_days": self.keep_days
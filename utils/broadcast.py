@@ -8,19 +8,55 @@ Handles all broadcast messaging functionality with proper permissions and target
 
 import asyncio
 import logging
+import random
+import time
+from array import array
+from collections import deque
 from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime
 from dataclasses import dataclass
 from enum import Enum
 
 from aiogram import Bot
 from aiogram.types import Message, CallbackQuery, InputMediaPhoto, InputMediaVideo, InputMediaDocument
-from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramNotFound,
+    TelegramRetryAfter,
+)
 
 from database.db_manager import DatabaseManager
 from utils.helpers import safe_send_message
 
 
+class TokenBucket:
+    """Token-bucket rate limiter shared across one broadcast.
+
+    Tokens refill continuously at `rate` per second; acquire() sleeps only
+    when the bucket is empty, so senders run at the real ceiling instead of
+    paying a fixed delay per message.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+
 class BroadcastTargetType(Enum):
     """Broadcast target types"""
     ALL_USERS = "all_users"
@@ -32,6 +68,35 @@ class BroadcastTargetType(Enum):
     CLASS_STUDENTS = "class_students"
 
 
+# Admin-wide audiences and their DB filter names - these can be huge, so
+# their recipients are streamed from the DB instead of materialized.
+_ADMIN_FILTERS = {
+    BroadcastTargetType.ALL_USERS: 'all',
+    BroadcastTargetType.ALL_MANAGERS: 'managers',
+    BroadcastTargetType.ALL_OWNERS: 'owners',
+    BroadcastTargetType.ALL_STUDENTS: 'students',
+}
+
+# Group/class cohorts and the DB method that fetches them (all take the
+# target_id). One dict hit replaces the old elif ladder.
+_GROUP_SOURCES = {
+    BroadcastTargetType.GROUP_MANAGERS: 'get_group_managers_for_broadcast',
+    BroadcastTargetType.GROUP_STUDENTS: 'get_group_students_for_broadcast',
+    BroadcastTargetType.CLASS_STUDENTS: 'get_class_students_for_broadcast',
+}
+
+# Display labels for previews, built once instead of per call
+_TARGET_LABELS = {
+    BroadcastTargetType.ALL_USERS: "المشتركين",
+    BroadcastTargetType.ALL_MANAGERS: "ممثلي الشعب",
+    BroadcastTargetType.ALL_OWNERS: "كل الاساتيذ",
+    BroadcastTargetType.ALL_STUDENTS: "كل الطلاب",
+    BroadcastTargetType.GROUP_MANAGERS: "ممثلي الكروب",
+    BroadcastTargetType.GROUP_STUDENTS: "الطلاب الكروب",
+    BroadcastTargetType.CLASS_STUDENTS: "طلاب الشعبه"
+}
+
+
 @dataclass
 class BroadcastMessage:
     """Broadcast message data structure"""
@@ -57,40 +122,127 @@ class BroadcastResult:
     errors: List[str]
 
 
+# Media dispatch table: message_type -> (Bot method name, file_id kwarg).
+# One dict hit per recipient instead of walking an if/elif chain.
+_SENDERS = {
+    "photo": ("send_photo", "photo"),
+    "video": ("send_video", "video"),
+    "document": ("send_document", "document"),
+    "audio": ("send_audio", "audio"),
+    "voice": ("send_voice", "voice"),
+}
+
+# Counter slots for the per-batch result array - one O(1) array store in
+# the hot send path instead of a dict-hash lookup per outcome.
+_IDX_OK, _IDX_FAIL, _IDX_BLOCKED, _IDX_DELETED = range(4)
+
+# Transient network failures get this many attempts before the recipient
+# is counted as failed.
+_SEND_MAX_ATTEMPTS = 3
+
+# Only this many error strings are ever shown, so only this many are
+# ever formatted - a broadcast hitting 50k blocked users must not pay
+# 50k f-string allocations for a report that displays ten.
+_MAX_STORED_ERRORS = 10
+
+# Superadmin lookups hit the DB on every permission check, but roles
+# change rarely - cache them briefly and invalidate on role changes.
+_SUPERADMIN_CACHE_TTL = 60
+_SUPERADMIN_CACHE_MAX = 1024
+
+
 class BroadcastManager:
     """Main broadcast management class"""
-    
+
+    # user_id -> (is_superadmin, expiry). Shared across instances so every
+    # manager sees the same invalidation.
+    _superadmin_cache: Dict[int, Tuple[bool, float]] = {}
+
     def __init__(self, db: DatabaseManager, bot: Bot, logger: Optional[logging.Logger] = None):
         self.db = db
         self.bot = bot
         self.logger = logger or logging.getLogger(__name__)
         
-        # Rate limiting settings
+        # Rate limiting: one token bucket for the whole broadcast, capped
+        # just below Telegram's ~30 msg/s ceiling. The semaphore only
+        # bounds parallel in-flight requests.
         self.max_concurrent_sends = 20  # Maximum concurrent sends
-        self.delay_between_batches = 1.0  # Delay between batches in seconds
-        self.delay_between_sends = 0.1  # Delay between individual sends
+        self.global_limiter = TokenBucket(rate=28.0)
+
+        # Concurrency gate: a Condition-guarded counter instead of a
+        # Semaphore, so the cap can be lowered mid-broadcast when Telegram
+        # answers with RetryAfter and raised back once the window passes.
+        self._active = 0
+        self._cmax = self.max_concurrent_sends
+        self._cond = asyncio.Condition()
+        self._recovery_task: Optional[asyncio.Task] = None
+
+    async def _acquire_slot(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._active < self._cmax)
+            self._active += 1
+
+    async def _release_slot(self):
+        async with self._cond:
+            self._active -= 1
+            self._cond.notify(1)
+
+    async def set_concurrency(self, n: int):
+        """Resize the send concurrency cap; waiters re-check immediately"""
+        async with self._cond:
+            self._cmax = max(1, n)
+            self._cond.notify_all()
+
+    def _schedule_concurrency_recovery(self, delay: float):
+        """Restore full concurrency once the flood-control window passes"""
+        if self._recovery_task and not self._recovery_task.done():
+            return
+
+        async def _recover():
+            await asyncio.sleep(delay)
+            await self.set_concurrency(self.max_concurrent_sends)
+            self.logger.info(f"📈 Broadcast concurrency restored to {self.max_concurrent_sends}")
+
+        self._recovery_task = asyncio.create_task(_recover())
+
+    async def _is_superadmin(self, user_id: int) -> bool:
+        """is_superadmin with a short TTL cache in front of the DB"""
+        cached = self._superadmin_cache.get(user_id)
+        now = time.monotonic()
+        if cached and cached[1] > now:
+            return cached[0]
+
+        is_sa = await self.db.is_superadmin(user_id)
+        cache = self._superadmin_cache
+        if len(cache) >= _SUPERADMIN_CACHE_MAX:
+            cache.clear()
+        cache[user_id] = (is_sa, now + _SUPERADMIN_CACHE_TTL)
+        return is_sa
+
+    @classmethod
+    def invalidate_superadmin_cache(cls, user_id: Optional[int] = None):
+        """Drop cached role lookups (call after promoting/demoting an admin)"""
+        if user_id is None:
+            cls._superadmin_cache.clear()
+        else:
+            cls._superadmin_cache.pop(user_id, None)
     
     async def validate_broadcast_permission(self, user_id: int, target_type: BroadcastTargetType, 
                                           target_id: Optional[int] = None) -> bool:
         """Validate if user has permission to broadcast to target"""
         try:
-            # Check if user is superadmin (can broadcast to anyone)
-            if await self.db.is_superadmin(user_id):
+            # Check if user is superadmin (can broadcast to anyone).
+            # One cached lookup - the ALL_* branches below need nothing
+            # more, since they are superadmin-only anyway.
+            if await self._is_superadmin(user_id):
                 return True
-            
-            # Check specific permissions based on target type
-            if target_type == BroadcastTargetType.ALL_USERS:
-                return await self.db.is_superadmin(user_id)
-            
-            elif target_type == BroadcastTargetType.ALL_MANAGERS:
-                return await self.db.is_superadmin(user_id)
-            
-            elif target_type == BroadcastTargetType.ALL_OWNERS:
-                return await self.db.is_superadmin(user_id)
-            
-            elif target_type == BroadcastTargetType.ALL_STUDENTS:
-                return await self.db.is_superadmin(user_id)
-            
+
+            if target_type in (BroadcastTargetType.ALL_USERS,
+                               BroadcastTargetType.ALL_MANAGERS,
+                               BroadcastTargetType.ALL_OWNERS,
+                               BroadcastTargetType.ALL_STUDENTS):
+                return False
+
             elif target_type == BroadcastTargetType.GROUP_MANAGERS:
                 if not target_id:
                     return False
@@ -117,151 +269,198 @@ class BroadcastManager:
                                   sender_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get list of target users for broadcast"""
         try:
-            targets = []
-            
-            if target_type == BroadcastTargetType.ALL_USERS:
-                targets = await self.db.get_all_users_for_admin_broadcast('all')
-            
-            elif target_type == BroadcastTargetType.ALL_MANAGERS:
-                targets = await self.db.get_all_users_for_admin_broadcast('managers')
-            
-            elif target_type == BroadcastTargetType.ALL_OWNERS:
-                targets = await self.db.get_all_users_for_admin_broadcast('owners')
-            
-            elif target_type == BroadcastTargetType.ALL_STUDENTS:
-                targets = await self.db.get_all_users_for_admin_broadcast('students')
-            
-            elif target_type == BroadcastTargetType.GROUP_MANAGERS:
-                if not target_id:
-                    return []
-                targets = await self.db.get_group_managers_for_broadcast(target_id)
-            
-            elif target_type == BroadcastTargetType.GROUP_STUDENTS:
-                if not target_id:
-                    return []
-                targets = await self.db.get_group_students_for_broadcast(target_id)
-            
-            elif target_type == BroadcastTargetType.CLASS_STUDENTS:
-                if not target_id:
-                    return []
-                targets = await self.db.get_class_students_for_broadcast(target_id)
-            
-            # Remove sender from targets to avoid self-messaging
-            if sender_id and targets:
-                targets = [target for target in targets if target.get('user_id') != sender_id]
-            
-            return targets
-            
+            # Admin-wide audiences: the sender is already excluded in SQL
+            filter_type = _ADMIN_FILTERS.get(target_type)
+            if filter_type is not None:
+                return await self.db.get_all_users_for_admin_broadcast(filter_type, sender_id=sender_id)
+
+            method_name = _GROUP_SOURCES.get(target_type)
+            if method_name is None or not target_id:
+                return []
+            targets = await getattr(self.db, method_name)(target_id)
+
+            # One pass: skip the sender and drop duplicate user_ids (a
+            # user enrolled twice must not get the message twice).
+            seen = set()
+            out = []
+            for target in targets:
+                uid = target['user_id']
+                if uid == sender_id or uid in seen:
+                    continue
+                seen.add(uid)
+                out.append(target)
+
+            return out
+
         except Exception as e:
             self.logger.error(f"❌ Error getting broadcast targets: {e}")
             return []
+
+    async def get_broadcast_targets_multi(self, specs: List[Tuple[BroadcastTargetType, Optional[int]]],
+                                          sender_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get the merged recipients for several target specs at once.
+
+        The per-spec DB fetches run concurrently, so a composite broadcast
+        (e.g. all owners + all managers) costs one round-trip, not one per
+        spec. Overlapping audiences are deduped by user_id.
+        """
+        results = await asyncio.gather(
+            *[self.get_broadcast_targets(target_type, target_id, sender_id)
+              for target_type, target_id in specs],
+            return_exceptions=True
+        )
+
+        merged: Dict[int, Dict[str, Any]] = {}
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error(f"❌ Error fetching composite broadcast targets: {result}")
+                continue
+            for target in result:
+                merged.setdefault(target['user_id'], target)
+        return list(merged.values())
+
+    async def iter_broadcast_target_chunks(self, target_type: BroadcastTargetType,
+                                           target_id: Optional[int] = None,
+                                           sender_id: Optional[int] = None,
+                                           chunk_size: int = 1000):
+        """Yield recipient chunks for a broadcast.
+
+        Admin-wide audiences stream straight from the DB cursor, so a
+        100k-user broadcast starts sending after one fetch instead of
+        after the whole recipient list is built. Group/class cohorts are
+        small and are fetched in one go, then sliced.
+        """
+        filter_type = _ADMIN_FILTERS.get(target_type)
+        if filter_type is not None:
+            async for chunk in self.db.stream_users_for_admin_broadcast(
+                    filter_type, sender_id=sender_id, chunk_size=chunk_size):
+                yield chunk
+            return
+
+        targets = await self.get_broadcast_targets(target_type, target_id, sender_id)
+        for i in range(0, len(targets), chunk_size):
+            yield targets[i:i + chunk_size]
     
-    async def send_single_message(self, user_id: int, message: BroadcastMessage) -> Tuple[bool, str]:
-        """Send message to a single user"""
-        try:
-            if message.message_type == "text":
-                success = await safe_send_message(
-                    chat_id=user_id,
-                    text=message.message_text,
-                    bot=self.bot
-                )
-                return success, "" if success else "Failed to send text message"
-            
-            elif message.message_type == "photo":
-                await self.bot.send_photo(
-                    chat_id=user_id,
-                    photo=message.file_id,
-                    caption=message.caption
-                )
-                return True, ""
-            
-            elif message.message_type == "video":
-                await self.bot.send_video(
-                    chat_id=user_id,
-                    video=message.file_id,
-                    caption=message.caption
-                )
-                return True, ""
-            
-            elif message.message_type == "document":
-                await self.bot.send_document(
-                    chat_id=user_id,
-                    document=message.file_id,
-                    caption=message.caption
-                )
-                return True, ""
-            
-            elif message.message_type == "audio":
-                await self.bot.send_audio(
-                    chat_id=user_id,
-                    audio=message.file_id,
-                    caption=message.caption
-                )
-                return True, ""
-            
-            elif message.message_type == "voice":
-                await self.bot.send_voice(
+    async def send_single_message(self, user_id: int, message: BroadcastMessage,
+                                  _attempt: int = 0) -> Tuple[bool, str]:
+        """Send message to a single user.
+
+        Transient network errors retry with jittered exponential backoff;
+        permanent failures (blocked, deleted, bad request) never retry.
+        """
+        last_error = ""
+        for retry in range(_SEND_MAX_ATTEMPTS):
+            try:
+                if message.message_type == "text":
+                    success = await safe_send_message(
+                        chat_id=user_id,
+                        text=message.message_text,
+                        bot=self.bot
+                    )
+                    return success, "" if success else "Failed to send text message"
+
+                sender = _SENDERS.get(message.message_type)
+                if sender is None:
+                    return False, f"Unsupported message type: {message.message_type}"
+
+                method_name, file_kwarg = sender
+                await getattr(self.bot, method_name)(
                     chat_id=user_id,
-                    voice=message.file_id,
-                    caption=message.caption
+                    caption=message.caption,
+                    **{file_kwarg: message.file_id}
                 )
                 return True, ""
-            
-            else:
-                return False, f"Unsupported message type: {message.message_type}"
-        
-        except TelegramForbiddenError:
-            return False, "user_blocked_bot"
-        except TelegramBadRequest as e:
-            if "chat not found" in str(e).lower():
+
+            except TelegramRetryAfter as e:
+                # Flood control: shed concurrency for the advertised window,
+                # then let the recovery task raise it back.
+                await self.set_concurrency(max(1, self._cmax // 2))
+                self._schedule_concurrency_recovery(e.retry_after)
+                if _attempt >= 1:
+                    return False, f"rate_limited: retry after {e.retry_after}s"
+                # One retry once the window passes; the depth guard stops
+                # recursion if Telegram throttles us again.
+                await asyncio.sleep(e.retry_after)
+                return await self.send_single_message(user_id, message, _attempt + 1)
+            except TelegramForbiddenError:
+                return False, "user_blocked_bot"
+            except TelegramNotFound:
                 return False, "user_deleted_account"
-            return False, f"telegram_error: {str(e)}"
-        except Exception as e:
-            return False, f"unexpected_error: {str(e)}"
+            except TelegramBadRequest as e:
+                # Telegram reports deleted chats as 400, not 404, so this one
+                # message check has to stay.
+                if "chat not found" in e.message.lower():
+                    return False, "user_deleted_account"
+                return False, f"telegram_error: {e.message}"
+            except TelegramNetworkError as e:
+                # Transient (timeouts, connection resets) - back off and
+                # retry instead of dropping the recipient.
+                last_error = f"network_error: {e.message}"
+                if retry < _SEND_MAX_ATTEMPTS - 1:
+                    backoff = min(5.0, 0.5 * (2 ** retry))
+                    await asyncio.sleep(backoff + random.uniform(0, 0.5))
+            except Exception as e:
+                return False, f"unexpected_error: {str(e)}"
+
+        return False, last_error
     
     async def send_broadcast_batch(self, targets: List[Dict[str, Any]], message: BroadcastMessage, 
                                  start_index: int, batch_size: int) -> Dict[str, Any]:
         """Send broadcast to a batch of users"""
         batch_targets = targets[start_index:start_index + batch_size]
-        batch_results = {
-            'successful': 0,
-            'failed': 0,
-            'blocked': 0,
-            'deleted': 0,
-            'errors': []
-        }
-        
-        # Create semaphore to limit concurrent sends
-        semaphore = asyncio.Semaphore(self.max_concurrent_sends)
-        
+
+        # Flat counter array + bounded error deque: memory stays capped no
+        # matter how many sends fail.
+        counters = array('Q', [0, 0, 0, 0])
+        errors: deque = deque(maxlen=_MAX_STORED_ERRORS)
+        deliveries = []  # (user_id, status, error) rows for the audit batch
+
         async def send_to_user(target):
-            async with semaphore:
+            await self._acquire_slot()
+            try:
+                # Take a send slot from the shared bucket; no fixed sleep,
+                # so throughput tracks the rate cap instead of the delay.
+                await self.global_limiter.acquire()
                 user_id = target['user_id']
                 success, error = await self.send_single_message(user_id, message)
-                
+
                 if success:
-                    batch_results['successful'] += 1
+                    counters[_IDX_OK] += 1
+                    deliveries.append((user_id, 'sent', None))
                 else:
-                    batch_results['failed'] += 1
+                    counters[_IDX_FAIL] += 1
                     if error == "user_blocked_bot":
-                        batch_results['blocked'] += 1
+                        counters[_IDX_BLOCKED] += 1
+                        deliveries.append((user_id, 'blocked', None))
                     elif error == "user_deleted_account":
-                        batch_results['deleted'] += 1
+                        counters[_IDX_DELETED] += 1
+                        deliveries.append((user_id, 'deleted', None))
                     else:
-                        batch_results['errors'].append(f"User {user_id}: {error}")
-                
-                # Small delay between sends to avoid rate limiting
-                await asyncio.sleep(self.delay_between_sends)
-        
+                        # Don't even format the string once the cap is hit
+                        if len(errors) < _MAX_STORED_ERRORS:
+                            errors.append(f"User {user_id}: {error}")
+                        deliveries.append((user_id, 'failed', error))
+            finally:
+                await self._release_slot()
+
         # Send to all users in batch concurrently
         tasks = [send_to_user(target) for target in batch_targets]
         await asyncio.gather(*tasks, return_exceptions=True)
-        
-        return batch_results
+
+        # Re-shape into the dict send_broadcast aggregates
+        return {
+            'successful': counters[_IDX_OK],
+            'failed': counters[_IDX_FAIL],
+            'blocked': counters[_IDX_BLOCKED],
+            'deleted': counters[_IDX_DELETED],
+            'errors': errors,
+            'deliveries': deliveries
+        }
     
     async def send_broadcast(self, message: BroadcastMessage) -> BroadcastResult:
         """Send broadcast message to all targets"""
-        start_time = datetime.now()
+        # Monotonic clock: duration survives NTP/DST wall-clock jumps
+        start_time = time.monotonic()
         
         try:
             # Validate permission
@@ -281,10 +480,61 @@ class BroadcastManager:
                     errors=["Permission denied"]
                 )
             
-            # Get targets
-            targets = await self.get_broadcast_targets(message.target_type, message.target_id, message.sender_id)
-            
-            if not targets:
+            # Stream recipients and send chunk by chunk: the first message
+            # goes out after one DB fetch and memory stays flat no matter
+            # how large the audience is.
+            total_results = {
+                'successful': 0,
+                'failed': 0,
+                'blocked': 0,
+                'deleted': 0,
+                'errors': deque(maxlen=_MAX_STORED_ERRORS),
+            }
+
+            chunk_size = 1000
+            total_targets = 0
+            chunk_num = 0
+            message_saved = False
+
+            async for chunk in self.iter_broadcast_target_chunks(
+                    message.target_type, message.target_id, message.sender_id, chunk_size):
+                if not message_saved:
+                    # Save message to database (only once we know someone
+                    # will actually receive it)
+                    await self.db.save_broadcast_message(
+                        sender_id=message.sender_id,
+                        target_type=message.target_type.value,
+                        target_id=message.target_id,
+                        message_text=message.message_text,
+                        message_type=message.message_type,
+                        file_id=message.file_id
+                    )
+                    message_saved = True
+                    self.logger.info(f"📢 Starting broadcast ({message.target_type.value})")
+
+                total_targets += len(chunk)
+                batch_results = await self.send_broadcast_batch(chunk, message, 0, len(chunk))
+
+                # Accumulate results
+                for key in ['successful', 'failed', 'blocked', 'deleted']:
+                    total_results[key] += batch_results[key]
+                for err in batch_results['errors']:
+                    if len(total_results['errors']) >= _MAX_STORED_ERRORS:
+                        break
+                    total_results['errors'].append(err)
+
+                # Flush this chunk's audit rows right away - one
+                # executemany per chunk keeps memory flat instead of
+                # buffering a tuple per recipient for the whole broadcast
+                await self.db.bulk_insert_broadcast_deliveries(
+                    message.sender_id, batch_results['deliveries']
+                )
+
+                chunk_num += 1
+                self.logger.info(f"📊 Broadcast progress: {total_targets} recipients processed "
+                               f"({chunk_num} chunks)")
+
+            if total_targets == 0:
                 return BroadcastResult(
                     total_targets=0,
                     successful_sends=0,
@@ -295,61 +545,13 @@ class BroadcastManager:
                     send_duration=0.0,
                     errors=["No targets found"]
                 )
-            
-            # Save message to database
-            await self.db.save_broadcast_message(
-                sender_id=message.sender_id,
-                target_type=message.target_type.value,
-                target_id=message.target_id,
-                message_text=message.message_text,
-                message_type=message.message_type,
-                file_id=message.file_id
-            )
-            
-            # Send in batches
-            total_results = {
-                'successful': 0,
-                'failed': 0,
-                'blocked': 0,
-                'deleted': 0,
-                'errors': []
-            }
-            
-            batch_size = 50  # Process 50 users at a time
-            total_batches = (len(targets) + batch_size - 1) // batch_size
-            
-            self.logger.info(f"📢 Starting broadcast to {len(targets)} users in {total_batches} batches")
-            
-            for batch_num in range(total_batches):
-                start_index = batch_num * batch_size
-                
-                batch_results = await self.send_broadcast_batch(
-                    targets, message, start_index, batch_size
-                )
-                
-                # Accumulate results
-                for key in ['successful', 'failed', 'blocked', 'deleted']:
-                    total_results[key] += batch_results[key]
-                total_results['errors'].extend(batch_results['errors'])
-                
-                # Log progress
-                progress = ((batch_num + 1) / total_batches) * 100
-                self.logger.info(f"📊 Broadcast progress: {progress:.1f}% "
-                               f"({batch_num + 1}/{total_batches} batches)")
-                
-                # Delay between batches
-                if batch_num < total_batches - 1:
-                    await asyncio.sleep(self.delay_between_batches)
-            
+
             # Calculate final results
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
-            
-            total_targets = len(targets)
+            duration = time.monotonic() - start_time
             successful_sends = total_results['successful']
             failed_sends = total_results['failed']
             success_rate = (successful_sends / total_targets) * 100 if total_targets > 0 else 0
-            
+
             # Log broadcast completion
             await self.db.add_log(
                 user_id=message.sender_id,
@@ -369,13 +571,12 @@ class BroadcastManager:
                 deleted_users=total_results['deleted'],
                 success_rate=success_rate,
                 send_duration=duration,
-                errors=total_results['errors'][:10]  # Limit errors to first 10
+                errors=list(total_results['errors'])[:10]  # Limit errors to first 10
             )
             
         except Exception as e:
             self.logger.error(f"❌ Error in broadcast: {e}")
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
+            duration = time.monotonic() - start_time
             
             return BroadcastResult(
                 total_targets=0,
@@ -421,21 +622,10 @@ class BroadcastManager:
         """Get preview information about broadcast targets"""
         try:
             targets = await self.get_broadcast_targets(target_type, target_id, sender_id)
-            
-            # Get target type name in Persian
-            type_names = {
-                BroadcastTargetType.ALL_USERS: "المشتركين",
-                BroadcastTargetType.ALL_MANAGERS: "ممثلي الشعب",
-                BroadcastTargetType.ALL_OWNERS: "كل الاساتيذ",
-                BroadcastTargetType.ALL_STUDENTS: "كل الطلاب",
-                BroadcastTargetType.GROUP_MANAGERS: "ممثلي الكروب",
-                BroadcastTargetType.GROUP_STUDENTS: "الطلاب الكروب",
-                BroadcastTargetType.CLASS_STUDENTS: "طلاب الشعبه"
-            }
-            
+
             return {
                 'target_count': len(targets),
-                'target_name': type_names.get(target_type, "نامشخص"),
+                'target_name': _TARGET_LABELS.get(target_type, "نامشخص"),
                 'targets': targets[:10]  # First 10 for preview
             }
             
@@ -448,6 +638,17 @@ class BroadcastManager:
             }
 
 
+# Media attribute scan order and how to pull the file_id out of each -
+# drives extract_message_data without an if/elif per type.
+_MEDIA_ATTRS = (
+    ("photo", lambda m: m.photo[-1].file_id),
+    ("video", lambda m: m.video.file_id),
+    ("document", lambda m: m.document.file_id),
+    ("audio", lambda m: m.audio.file_id),
+    ("voice", lambda m: m.voice.file_id),
+)
+
+
 def extract_message_data(message: Message) -> BroadcastMessage:
     """Extract broadcast message data from Telegram message"""
     message_data = BroadcastMessage(
@@ -456,27 +657,19 @@ def extract_message_data(message: Message) -> BroadcastMessage:
         message_text=message.text or message.caption,
         caption=message.caption
     )
-    
+
     # Determine message type and file_id
     if message.text:
         message_data.message_type = "text"
-    elif message.photo:
-        message_data.message_type = "photo"
-        message_data.file_id = message.photo[-1].file_id
-    elif message.video:
-        message_data.message_type = "video"
-        message_data.file_id = message.video.file_id
-    elif message.document:
-        message_data.message_type = "document"
-        message_data.file_id = message.document.file_id
-    elif message.audio:
-        message_data.message_type = "audio"
-        message_data.file_id = message.audio.file_id
-    elif message.voice:
-        message_data.message_type = "voice"
-        message_data.file_id = message.voice.file_id
-    else:
-        message_data.message_type = "text"
-        message_data.message_text = "الميديا هذي غير مدعومه"
-    
+        return message_data
+
+    for name, get_file_id in _MEDIA_ATTRS:
+        if getattr(message, name):
+            message_data.message_type = name
+            message_data.file_id = get_file_id(message)
+            return message_data
+
+    message_data.message_type = "text"
+    message_data.message_text = "الميديا هذي غير مدعومه"
+
     return message_data
@@ -2,26 +2,42 @@
 # -*- coding: utf-8 -*-
 
 import logging
+import queue
 import sys
-from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from pathlib import Path
 
+# Names already wired up - repeated setup_logger calls (reloads, tests)
+# must not reopen log files or stack duplicate handlers.
+_configured = set()
+
+
+def _keep_log_extension(default_name: str) -> str:
+    """Rename rotated files from name.log.YYYY-MM-DD to name.YYYY-MM-DD.log
+
+    Keeps the .log extension last so anything matching on it (log backups,
+    viewers) still picks up rotated files.
+    """
+    head, sep, date = default_name.rpartition('.log.')
+    if sep:
+        return f"{head}.{date}.log"
+    return default_name
+
 
 def setup_logger(name: str = "school_bot", level: int = logging.INFO) -> logging.Logger:
     """Setup logger with file and console handlers"""
-    
+
+    if name in _configured:
+        return logging.getLogger(name)
+
     # Create logs directory if it doesn't exist
     logs_dir = Path("logs")
     logs_dir.mkdir(exist_ok=True)
-    
+
     # Create logger
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    
-    # Remove existing handlers
-    for handler in logger.handlers[:]:
-        logger.removeHandler(handler)
-    
+
     # Create formatters
     detailed_formatter = logging.Formatter(
         fmt='%(asctime)s | %(name)s | %(levelname)s | %(funcName)s:%(lineno)d | %(message)s',
@@ -33,35 +49,53 @@ def setup_logger(name: str = "school_bot", level: int = logging.INFO) -> logging
         datefmt='%H:%M:%S'
     )
     
-    # File handler for all logs
-    file_handler = logging.FileHandler(
-        logs_dir / f"{name}_{datetime.now().strftime('%Y%m%d')}.log",
+    # File handler for all logs - rotated at midnight instead of being
+    # reopened with a new date stamp on every setup call
+    file_handler = TimedRotatingFileHandler(
+        logs_dir / f"{name}.log",
+        when='midnight',
+        backupCount=30,
         encoding='utf-8'
     )
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(detailed_formatter)
-    
+    file_handler.namer = _keep_log_extension
+
     # File handler for errors only
-    error_handler = logging.FileHandler(
-        logs_dir / f"{name}_errors_{datetime.now().strftime('%Y%m%d')}.log",
+    error_handler = TimedRotatingFileHandler(
+        logs_dir / f"{name}_errors.log",
+        when='midnight',
+        backupCount=30,
         encoding='utf-8'
     )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(detailed_formatter)
+    error_handler.namer = _keep_log_extension
     
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
     console_handler.setFormatter(simple_formatter)
     
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(error_handler)
-    logger.addHandler(console_handler)
-    
+    # Only a QueueHandler sits on the logger: emit() is a lock-free queue
+    # put, so log calls never block the event loop on file/console I/O.
+    # The listener drains the queue on its own thread.
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+
+    listener = QueueListener(
+        log_queue, file_handler, error_handler, console_handler,
+        respect_handler_level=True
+    )
+    listener.start()
+    # Stash for shutdown so pending records can be flushed
+    logger.queue_listener = listener
+
     # Prevent propagation to root logger
     logger.propagate = False
-    
+
+    _configured.add(name)
+
     return logger
 
 
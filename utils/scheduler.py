@@ -2,8 +2,11 @@
 Exam reminder scheduler system
 """
 import asyncio
+import heapq
 import logging
+import random
 from datetime import datetime
+import aiosqlite
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -14,61 +17,143 @@ logger = logging.getLogger(__name__)
 
 class ExamReminderScheduler:
     """Handles automated exam reminders"""
-    
+
+    # Tease templates, built once - only the chosen one is formatted,
+    # instead of evaluating six f-strings and discarding five per call
+    TEASE_TEMPLATES = (
+        "💫 {fast} أبدع أكثر من {lazy}! 🚀\n\n{lazy} لا تخاف، بعدك إلّه وقت! ⏰",
+        "⚡ {fast} كان أسرع! 🏃‍♂️\n\n{lazy} هدي، بعدك فرصة! 😊",
+        "🏃‍♂️ {fast} ركض وسوى الامتحان!\n\n{lazy} إنت بعدك تكدر! 💪",
+        "🎯 {fast} ورّاك شلون ينحل الامتحان!\n\n{lazy} شد حيلك! 🚀",
+        "🌟 {fast} كلش ممتاز!\n\n{lazy} إنت بعدك تكدر تصير مثله! ✨",
+        "🔥 {fast} أبدع كلش!\n\n{lazy} أطلّع حماسك! 💥"
+    )
+
     def __init__(self, bot: "Bot", db: "DatabaseManager"):
         self.bot = bot
         self.db = db
         self.running = False
-    
+        # Set by notify_schedule_changed() to cut the current sleep short
+        self._wake_event = asyncio.Event()
+
     async def start(self):
         """Start the scheduler"""
         self.running = True
         logger.info("🔔 Exam reminder scheduler started")
-        
+
         while self.running:
             try:
                 await self.process_pending_reminders()
-                # Check every 5 minutes
-                await asyncio.sleep(300)
+                # Sleep until the next scheduled reminder is due instead of
+                # polling every 5 minutes; a newly scheduled exam wakes the
+                # loop immediately via the event.
+                delay = await self._seconds_until_next_reminder()
+                try:
+                    await asyncio.wait_for(self._wake_event.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake_event.clear()
             except Exception as e:
                 logger.error(f"❌ Scheduler error: {e}")
                 await asyncio.sleep(60)  # Retry after 1 minute on error
-    
+
     def stop(self):
         """Stop the scheduler"""
         self.running = False
+        self._wake_event.set()
         logger.info("🛑 Exam reminder scheduler stopped")
+
+    def notify_schedule_changed(self):
+        """Wake the scheduler loop - call after scheduling new reminders"""
+        self._wake_event.set()
+
+    async def _seconds_until_next_reminder(self) -> float:
+        """Seconds until the earliest unsent reminder is due
+
+        Overdue rows (reminders whose send keeps failing and therefore
+        stay unmarked) are excluded from the MIN - counting them would
+        clamp the sleep to the 1s floor and spin the loop at ~1 Hz. They
+        are retried on the 5-minute fallback cadence instead.
+        """
+        try:
+            now = datetime.now()
+            now_iso = now.isoformat()
+            async with aiosqlite.connect(self.db.db_path) as conn:
+                cursor = await conn.execute(
+                    """
+                    SELECT MIN(CASE WHEN scheduled_time > ? THEN scheduled_time END),
+                           SUM(scheduled_time <= ?)
+                    FROM reminder_schedules WHERE is_sent = 0
+                    """,
+                    (now_iso, now_iso)
+                )
+                next_due, overdue = await cursor.fetchone()
+
+            delay = 300.0
+            if next_due:
+                delay = max(1.0, (datetime.fromisoformat(next_due) - now).total_seconds())
+            if overdue:
+                delay = min(delay, 300.0)
+            return delay
+        except Exception as e:
+            logger.error(f"❌ Error finding next reminder time: {e}")
+        # Nothing scheduled (or query failed) - fall back to the old poll
+        return 300.0
     
     async def process_pending_reminders(self):
         """Process all pending reminders"""
         try:
             reminders = await self.db.get_pending_reminders()
-            
+            if not reminders:
+                return
+
+            # Collect the ids and mark them all in one transaction at the
+            # end - one fsync per cycle instead of one per reminder.
+            # Failed sends stay unmarked and are retried next cycle.
+            sent_ids = []
             for reminder in reminders:
-                await self.send_reminder(reminder)
-                await self.db.mark_reminder_sent(reminder['schedule_id'])
-            
+                if await self.send_reminder(reminder):
+                    sent_ids.append(reminder['schedule_id'])
+
+            if sent_ids:
+                await self._mark_many_reminders_sent(sent_ids)
+
         except Exception as e:
             logger.error(f"❌ Error processing reminders: {e}")
-    
-    async def send_reminder(self, reminder: dict):
-        """Send a specific reminder"""
+
+    async def _mark_many_reminders_sent(self, schedule_ids: list):
+        """Mark a batch of reminders as sent in a single transaction"""
+        try:
+            async with aiosqlite.connect(self.db.db_path) as conn:
+                await conn.executemany(
+                    "UPDATE reminder_schedules SET is_sent = 1 WHERE schedule_id = ?",
+                    [(schedule_id,) for schedule_id in schedule_ids]
+                )
+                await conn.commit()
+        except Exception as e:
+            logger.error(f"❌ Error marking reminders as sent: {e}")
+
+    async def send_reminder(self, reminder: dict) -> bool:
+        """Send a specific reminder, returning True on success"""
         try:
             reminder_type = reminder['reminder_type']
             exam_id = reminder['exam_id']
             exam_title = reminder['title']
             class_name = reminder['class_name']
             group_id = reminder['group_id']
-            
+
             if reminder_type == 'day1':
                 await self.send_day1_reminder(exam_id, exam_title, class_name, group_id)
             elif reminder_type == 'end':
                 await self.send_end_reminder(exam_id, exam_title, class_name, group_id)
             elif reminder_type == 'tease':
                 await self.send_tease_message(exam_id, exam_title, class_name, group_id)
-            
+
+            return True
+
         except Exception as e:
             logger.error(f"❌ Error sending reminder: {e}")
+            return False
     
     async def send_day1_reminder(self, exam_id: int, exam_title: str, class_name: str, group_id: int):
         """Send day 1 reminder to students who haven't submitted (group only)"""
@@ -80,9 +165,12 @@ class ExamReminderScheduler:
                 full_name = student['full_name']
                 username = student.get('username', '')
                 
-                # Check if this user is a manager or owner - don't send reminders to them
-                is_manager = await self._is_user_manager(user_id)
-                is_owner = await self._is_user_owner(user_id, group_id)
+                # Check if this user is a manager or owner - don't send
+                # reminders to them. Independent lookups, so overlap them.
+                is_manager, is_owner = await asyncio.gather(
+                    self._is_user_manager(user_id),
+                    self._is_user_owner(user_id, group_id)
+                )
                 
                 if is_manager or is_owner:
                     logger.info(f"⏭️ Skipping day1 reminder for {full_name} (manager/owner)")
@@ -121,17 +209,12 @@ class ExamReminderScheduler:
             else:
                 submit_percentage = 0
             
-            # Find fast responders (submitted in first 24 hours)
-            fast_responders = []
-            lazy_students = []
-            
-            # Sort submissions by time 
-            sorted_submissions = sorted(all_submissions, key=lambda x: x.get('submission_date', ''))
-            
-            if sorted_submissions:
-                # Get top 3 fastest
-                fast_responders = sorted_submissions[:3]
-            
+            # Top 3 fastest responders - nsmallest is O(N) against the
+            # O(N log N) of sorting every submission just to slice three
+            fast_responders = heapq.nsmallest(
+                3, all_submissions, key=lambda x: x.get('submission_date') or ''
+            )
+
             # Get lazy students (haven't submitted)
             lazy_students = students_without[:3]  # Show max 3
             
@@ -170,38 +253,52 @@ class ExamReminderScheduler:
     async def send_tease_message(self, exam_id: int, exam_title: str, class_name: str, group_id: int):
         """Send teasing message comparing fast vs slow students"""
         try:
-            import random
-            
             # Random chance to send tease (30% probability)
             if random.random() > 0.3:
                 return
-                
-            students_without = await self.db.get_students_without_submission(exam_id)
-            all_submissions = await self.db.get_exam_submissions(exam_id)
-            
-            if not students_without or not all_submissions:
-                return
-                
-            # Pick one fast responder and one lazy student
-            fast_student = random.choice(all_submissions)
-            lazy_student = random.choice(students_without)
-            
-            fast_name = fast_student.get('student_name') or fast_student.get('full_name', 'طالب شاطر')
+
+            # Pick one random submitter and one random pending student in
+            # SQL - two LIMIT 1 rows instead of materializing both full
+            # lists just to random.choice() a single entry from each
+            async with aiosqlite.connect(self.db.db_path) as conn:
+                conn.row_factory = aiosqlite.Row
+                cursor = await conn.execute("""
+                    SELECT COALESCE(st.full_name, u.full_name) AS student_name
+                    FROM submissions s
+                    JOIN users u ON s.student_user_id = u.user_id
+                    LEFT JOIN students st ON s.student_user_id = st.user_id
+                    WHERE s.exam_id = ?
+                    ORDER BY RANDOM() LIMIT 1
+                """, (exam_id,))
+                fast_student = await cursor.fetchone()
+                if not fast_student:
+                    return
+
+                cursor = await conn.execute("""
+                    SELECT st.full_name, u.username
+                    FROM students st
+                    JOIN users u ON st.user_id = u.user_id
+                    JOIN exams e ON st.class_id = e.class_id
+                    WHERE e.exam_id = ? AND st.status = 'approved'
+                    AND st.user_id NOT IN (
+                        SELECT DISTINCT s.student_user_id
+                        FROM submissions s
+                        WHERE s.exam_id = ?
+                    )
+                    ORDER BY RANDOM() LIMIT 1
+                """, (exam_id, exam_id))
+                lazy_student = await cursor.fetchone()
+                if not lazy_student:
+                    return
+
+            fast_name = fast_student['student_name'] or 'طالب شاطر'
             lazy_name = lazy_student['full_name']
-            lazy_username = lazy_student.get('username', '')
+            lazy_username = lazy_student['username'] or ''
             lazy_tag = f"@{lazy_username}" if lazy_username else lazy_name
             
-            # More varied and less aggressive tease messages
-            tease_messages = [
-                f"💫 {fast_name} أبدع أكثر من {lazy_tag}! 🚀\n\n{lazy_tag} لا تخاف، بعدك إلّه وقت! ⏰",
-                f"⚡ {fast_name} كان أسرع! 🏃‍♂️\n\n{lazy_tag} هدي، بعدك فرصة! 😊",
-                f"🏃‍♂️ {fast_name} ركض وسوى الامتحان!\n\n{lazy_tag} إنت بعدك تكدر! 💪",
-                f"🎯 {fast_name} ورّاك شلون ينحل الامتحان!\n\n{lazy_tag} شد حيلك! 🚀",
-                f"🌟 {fast_name} كلش ممتاز!\n\n{lazy_tag} إنت بعدك تكدر تصير مثله! ✨",
-                f"🔥 {fast_name} أبدع كلش!\n\n{lazy_tag} أطلّع حماسك! 💥"
-            ]
-            
-            tease_msg = random.choice(tease_messages)
+            tease_msg = random.choice(self.TEASE_TEMPLATES).format(
+                fast=fast_name, lazy=lazy_tag
+            )
             
             await self.bot.send_message(group_id, tease_msg)
             logger.info(f"😏 Tease message sent for exam {exam_title}")
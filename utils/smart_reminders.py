@@ -3,14 +3,35 @@
 
 import asyncio
 import logging
+import random
+from bisect import bisect_right
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+import aiosqlite
 from aiogram import Bot
+from aiogram.exceptions import TelegramNetworkError, TelegramRetryAfter
 from database.db_manager import DatabaseManager
+from utils.broadcast import TokenBucket
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Reminder fan-out: in-flight sends are capped below Telegram's ~30 msg/s
+# bot ceiling; the shared token bucket paces the actual rate.
+REMINDER_CONCURRENCY = 25
+
+# Retries per reminder message before giving up on that student
+SEND_MAX_ATTEMPTS = 5
+
+# Reminder thresholds, ascending and frozen at import so every instance
+# shares one tuple; _THRESHOLD_PERCENTS feeds the bisect cutoff.
+REMINDER_THRESHOLDS = (
+    {'percent': 50, 'label': 'الأول (50%)'},
+    {'percent': 70, 'label': 'الثاني (70%)'},
+    {'percent': 90, 'label': 'الأخير (90%)'}
+)
+_THRESHOLD_PERCENTS = tuple(t['percent'] for t in REMINDER_THRESHOLDS)
+
 class SmartReminderSystem:
     """Intelligent reminder system that monitors exam participation and sends comparative reminders"""
     
@@ -19,11 +40,20 @@ class SmartReminderSystem:
         self.db = db
         self.running = False
         self.check_interval = 3600  # Check every hour
-        self.REMINDER_THRESHOLDS = [
-            {'percent': 50, 'label': 'الأول (50%)'},
-            {'percent': 70, 'label': 'الثاني (70%)'},
-            {'percent': 90, 'label': 'الأخير (90%)'}
-        ]
+        # Per-cycle memoization of permission checks: one DB hit per unique
+        # user instead of two per pending student, reset every check pass.
+        self._manager_cache: Dict[int, bool] = {}
+        self._owner_cache: Dict[Tuple[int, int], bool] = {}
+        # creation_date is immutable per exam - parse it once and reuse
+        # the datetime across reminder thresholds
+        self._creation_cache: Dict[int, Optional[datetime]] = {}
+        # Long-lived connection shared by every query in this system -
+        # opened in start(), closed in stop(). aiosqlite serializes
+        # statements on its worker thread, so no extra locking is needed.
+        self._conn = None
+        # One limiter for the whole system: overlapping exams share the
+        # same Telegram rate budget instead of each getting a fresh bucket.
+        self._limiter = TokenBucket(rate=float(REMINDER_CONCURRENCY))
         
     async def start(self):
         """Start the smart reminder system"""
@@ -32,35 +62,35 @@ class SmartReminderSystem:
             
         self.running = True
         logger.info("🤖 Smart Reminder System started - 3 reminders only (50%, 70%, 90%)")
-        
-        # Initialize reminders tracking table if not exists
-        await self._init_reminders_table()
-        
+
+        # exam_reminders is part of the main schema now - no DDL here
+
         # Start the background task
         asyncio.create_task(self._reminder_loop())
     
     async def stop(self):
         """Stop the smart reminder system"""
         self.running = False
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
         logger.info("🤖 Smart Reminder System stopped")
-    
-    async def _init_reminders_table(self):
-        """Initialize the reminders tracking table"""
-        try:
-            import aiosqlite
-            async with aiosqlite.connect(self.db.db_path) as conn:
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS exam_reminders (
-                        exam_id INTEGER,
-                        reminder_percent INTEGER,
-                        sent_at TEXT,
-                        PRIMARY KEY (exam_id, reminder_percent)
-                    )
-                """)
-                await conn.commit()
-        except Exception as e:
-            logger.error(f"❌ Error initializing reminders table: {e}")
-    
+
+    async def _get_conn(self):
+        """Get the shared database connection, opening it on first use"""
+        if self._conn is None:
+            self._conn = await aiosqlite.connect(self.db.db_path)
+            self._conn.row_factory = aiosqlite.Row
+            # WAL lets the hourly reader run alongside bot writes; NORMAL
+            # sync and in-memory temp store cut per-query fsync/IO cost.
+            # busy_timeout makes writes wait out a concurrent writer
+            # instead of failing with "database is locked".
+            await self._conn.execute("PRAGMA journal_mode=WAL")
+            await self._conn.execute("PRAGMA synchronous=NORMAL")
+            await self._conn.execute("PRAGMA temp_store=MEMORY")
+            await self._conn.execute("PRAGMA busy_timeout=5000")
+        return self._conn
+
     async def _reminder_loop(self):
         """Main loop that runs the reminder checks"""
         while self.running:
@@ -74,6 +104,10 @@ class SmartReminderSystem:
     async def _check_active_exams(self):
         """Check all active exams and send intelligent reminders"""
         try:
+            # Permissions may change between cycles - start each pass fresh
+            self._manager_cache.clear()
+            self._owner_cache.clear()
+
             # Get all active exams that haven't expired
             active_exams = await self._get_active_exams()
             
@@ -86,20 +120,30 @@ class SmartReminderSystem:
     async def _get_active_exams(self) -> List[Dict[str, Any]]:
         """Get all active exams that are still within their duration"""
         try:
-            import aiosqlite
-            async with aiosqlite.connect(self.db.db_path) as conn:
-                conn.row_factory = aiosqlite.Row
-                cursor = await conn.execute("""
-                    SELECT e.*, c.class_name, c.group_id, g.group_title
-                    FROM exams e
-                    JOIN classes c ON e.class_id = c.class_id
-                    JOIN groups g ON c.group_id = g.group_id
-                    WHERE e.is_active = 1 
-                    AND datetime(e.creation_date, '+' || e.duration_days || ' days') > datetime('now')
-                    AND datetime(e.creation_date, '+2 hours') < datetime('now')  -- At least 2 hours old
-                """)
-                rows = await cursor.fetchall()
-                return [dict(row) for row in rows]
+            conn = await self._get_conn()
+            # percent_elapsed and the already-sent reminder list come back
+            # with the row, so threshold selection needs no further queries
+            # or Python date parsing.
+            cursor = await conn.execute("""
+                SELECT e.*, c.class_name, c.group_id, g.group_title,
+                    (julianday('now') - julianday(e.creation_date)) * 100.0 / e.duration_days AS percent_elapsed,
+                    (SELECT GROUP_CONCAT(r.reminder_percent)
+                     FROM exam_reminders r
+                     WHERE r.exam_id = e.exam_id) AS sent_percents,
+                    (SELECT COUNT(DISTINCT student_user_id)
+                     FROM submissions WHERE exam_id = e.exam_id) AS submitted_count,
+                    (SELECT COUNT(*) FROM students st
+                     WHERE st.class_id = e.class_id
+                     AND st.status = 'approved') AS total_students
+                FROM exams e
+                JOIN classes c ON e.class_id = c.class_id
+                JOIN groups g ON c.group_id = g.group_id
+                WHERE e.is_active = 1
+                AND datetime(e.creation_date, '+' || e.duration_days || ' days') > datetime('now')
+                AND datetime(e.creation_date, '+2 hours') < datetime('now')  -- At least 2 hours old
+            """)
+            rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
         except Exception as e:
             logger.error(f"❌ Error getting active exams: {e}")
             return []
@@ -109,37 +153,30 @@ class SmartReminderSystem:
         try:
             exam_id = exam['exam_id']
             class_id = exam['class_id']
-            group_id = exam['group_id']
-            
-            # Get all approved students in this class
-            students = await self.db.get_class_students(class_id, status='approved')
-            if not students:
+
+            # The aggregates ride on the active-exam row, so exams with no
+            # due reminder (the common case) are screened without queries
+            if exam['total_students'] == 0:
                 return
-            
-            # Get students who have submitted
-            submitted_students = await self._get_submitted_students(exam_id)
-            submitted_user_ids = {s['user_id'] for s in submitted_students}
-            
-            # Get students who haven't submitted
-            pending_students = [s for s in students if s['user_id'] not in submitted_user_ids]
-            
-            if not pending_students:
+
+            if exam['submitted_count'] >= exam['total_students']:
                 logger.info(f"✅ All students have submitted for exam {exam['title']}")
                 return
-            
-            # Calculate exam progress
-            total_students = len(students)
-            submitted_count = len(submitted_students)
-            submission_rate = (submitted_count / total_students) * 100 if total_students > 0 else 0
-            
+
             # Check which reminder should be sent (50%, 70%, or 90%)
-            reminder_to_send = await self._get_reminder_to_send(exam)
-            
-            if reminder_to_send:
+            reminder_to_send = self._get_reminder_to_send(exam)
+            if not reminder_to_send:
+                return
+
+            # Only now pull the pending roster (with fresh counts)
+            pending_students, submitted_count, total_students = \
+                await self._get_pending_students(exam_id, class_id)
+
+            if pending_students:
                 await self._send_intelligent_reminders(
-                    exam, 
-                    pending_students, 
-                    submitted_count, 
+                    exam,
+                    pending_students,
+                    submitted_count,
                     total_students,
                     reminder_to_send
                 )
@@ -147,102 +184,92 @@ class SmartReminderSystem:
         except Exception as e:
             logger.error(f"❌ Error processing exam reminders: {e}")
     
-    async def _get_submitted_students(self, exam_id: int) -> List[Dict[str, Any]]:
-        """Get students who have submitted for this exam"""
+    async def _get_pending_students(self, exam_id: int, class_id: int) -> Tuple[List[aiosqlite.Row], int, int]:
+        """Get students who haven't submitted, plus submitted/total counts
+
+        Single LEFT JOIN query - the anti-join and the counts run inside
+        SQLite instead of fetching both sides and diffing sets in Python.
+        """
         try:
-            import aiosqlite
-            async with aiosqlite.connect(self.db.db_path) as conn:
-                conn.row_factory = aiosqlite.Row
-                cursor = await conn.execute("""
-                    SELECT DISTINCT student_user_id as user_id FROM submissions 
-                    WHERE exam_id = ?
-                """, (exam_id,))
-                rows = await cursor.fetchall()
-                return [dict(row) for row in rows]
+            conn = await self._get_conn()
+            # The rows are kept as aiosqlite.Row objects - the send path
+            # only indexes user_id/full_name, so converting every row to a
+            # dict would just allocate N throwaway mappings.
+            cursor = await conn.execute("""
+                SELECT s.user_id, s.full_name,
+                    (SELECT COUNT(DISTINCT student_user_id)
+                     FROM submissions WHERE exam_id = ?) AS submitted_count,
+                    (SELECT COUNT(*) FROM students
+                     WHERE class_id = ? AND status = 'approved') AS total_students
+                FROM students s
+                LEFT JOIN submissions sub
+                    ON sub.exam_id = ? AND sub.student_user_id = s.user_id
+                WHERE s.class_id = ? AND s.status = 'approved'
+                AND sub.student_user_id IS NULL
+                ORDER BY s.full_name
+            """, (exam_id, class_id, exam_id, class_id))
+            rows = await cursor.fetchall()
+
+            if rows:
+                return list(rows), rows[0]['submitted_count'], rows[0]['total_students']
+
+            # Nobody pending: everyone submitted, or the class is empty
+            cursor = await conn.execute("""
+                SELECT COUNT(*) FROM students
+                WHERE class_id = ? AND status = 'approved'
+            """, (class_id,))
+            total = (await cursor.fetchone())[0]
+            return [], total, total
         except Exception as e:
-            logger.error(f"❌ Error getting submitted students: {e}")
-            return []
+            logger.error(f"❌ Error getting pending students: {e}")
+            return [], 0, 0
     
-    async def _get_reminder_to_send(self, exam: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Determine which reminder should be sent (50%, 70%, or 90%)"""
+    def _get_reminder_to_send(self, exam: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Determine which reminder should be sent (50%, 70%, or 90%)
+
+        Works entirely from the percent_elapsed and sent_percents columns
+        computed by _get_active_exams - no extra queries per threshold.
+        """
         try:
-            exam_id = exam['exam_id']
-            creation_date_str = exam['creation_date']
-            duration_days = exam['duration_days']
-            
-            # Parse creation date
-            try:
-                if 'T' in creation_date_str:
-                    creation_date = datetime.fromisoformat(creation_date_str.replace('Z', '+00:00'))
-                    if creation_date.tzinfo:
-                        creation_date = creation_date.replace(tzinfo=None)
-                else:
-                    creation_date = datetime.strptime(creation_date_str, '%Y-%m-%d %H:%M:%S')
-            except:
-                logger.warning(f"⚠️ Could not parse date for exam {exam_id}")
+            percent_elapsed = exam.get('percent_elapsed')
+            if percent_elapsed is None:
+                # julianday() returned NULL - unparseable creation_date
+                logger.warning(f"⚠️ Could not parse date for exam {exam['exam_id']}")
                 return None
-            
-            # Calculate time progress
-            now = datetime.now()
-            exam_end = creation_date + timedelta(days=duration_days)
-            total_duration = exam_end - creation_date
-            time_elapsed = now - creation_date
-            
-            # Calculate percentage of time elapsed
-            if total_duration.total_seconds() <= 0:
-                return None
-                
-            percent_elapsed = (time_elapsed.total_seconds() / total_duration.total_seconds()) * 100
-            
+
+            sent_percents = exam.get('sent_percents') or ''
+            already_sent = {int(p) for p in sent_percents.split(',') if p}
+
             logger.info(f"📊 Exam {exam['title']}: {percent_elapsed:.1f}% time elapsed")
-            
-            # Check each threshold
-            for threshold in self.REMINDER_THRESHOLDS:
-                threshold_percent = threshold['percent']
-                
-                # Check if we've crossed this threshold and haven't sent this reminder yet
-                if percent_elapsed >= threshold_percent:
-                    already_sent = await self._is_reminder_sent(exam_id, threshold_percent)
-                    
-                    if not already_sent:
-                        logger.info(f"✅ Time to send {threshold['label']} reminder for exam {exam['title']}")
-                        return threshold
-            
+
+            # bisect finds the crossed prefix; the lowest unsent crossed
+            # threshold wins so missed reminders still go out in order
+            crossed = bisect_right(_THRESHOLD_PERCENTS, percent_elapsed)
+            for threshold in REMINDER_THRESHOLDS[:crossed]:
+                if threshold['percent'] not in already_sent:
+                    logger.info(f"✅ Time to send {threshold['label']} reminder for exam {exam['title']}")
+                    return threshold
+
             return None
-            
+
         except Exception as e:
             logger.error(f"❌ Error checking reminder threshold: {e}")
             return None
-    
-    async def _is_reminder_sent(self, exam_id: int, reminder_percent: int) -> bool:
-        """Check if a specific reminder has already been sent"""
-        try:
-            import aiosqlite
-            async with aiosqlite.connect(self.db.db_path) as conn:
-                cursor = await conn.execute("""
-                    SELECT COUNT(*) FROM exam_reminders 
-                    WHERE exam_id = ? AND reminder_percent = ?
-                """, (exam_id, reminder_percent))
-                result = await cursor.fetchone()
-                return result[0] > 0
-        except Exception as e:
-            logger.error(f"❌ Error checking if reminder sent: {e}")
-            return False
-    
+
+
     async def _mark_reminder_sent(self, exam_id: int, reminder_percent: int):
         """Mark a reminder as sent"""
         try:
-            import aiosqlite
-            async with aiosqlite.connect(self.db.db_path) as conn:
-                await conn.execute("""
-                    INSERT OR REPLACE INTO exam_reminders (exam_id, reminder_percent, sent_at)
-                    VALUES (?, ?, ?)
-                """, (exam_id, reminder_percent, datetime.now().isoformat()))
-                await conn.commit()
+            conn = await self._get_conn()
+            await conn.execute("""
+                INSERT OR REPLACE INTO exam_reminders (exam_id, reminder_percent, sent_at)
+                VALUES (?, ?, ?)
+            """, (exam_id, reminder_percent, datetime.now().isoformat()))
+            await conn.commit()
         except Exception as e:
             logger.error(f"❌ Error marking reminder as sent: {e}")
     
-    async def _send_intelligent_reminders(self, exam: Dict[str, Any], pending_students: List[Dict[str, Any]], 
+    async def _send_intelligent_reminders(self, exam: Dict[str, Any], pending_students: List[aiosqlite.Row],
                                         submitted_count: int, total_students: int, reminder_info: Dict[str, Any]):
         """Send intelligent comparative reminders - ONLY to students, NOT to group"""
         try:
@@ -254,27 +281,15 @@ class SmartReminderSystem:
             reminder_label = reminder_info['label']
             reminder_percent = reminder_info['percent']
             
-            # Calculate time remaining
-            import aiosqlite
-            async with aiosqlite.connect(self.db.db_path) as conn:
-                cursor = await conn.execute("""
-                    SELECT 
-                        (julianday(datetime(creation_date, '+' || duration_days || ' days')) - julianday('now')) * 24 as hours_remaining
-                    FROM exams 
-                    WHERE exam_id = ?
-                """, (exam_id,))
-                result = await cursor.fetchone()
-                
-                if result and result[0]:
-                    hours_remaining = max(0, int(result[0]))
-                else:
-                    try:
-                        creation_date = datetime.strptime(exam['creation_date'], '%Y-%m-%d %H:%M:%S')
-                        exam_end = creation_date + timedelta(days=duration_days)
-                        time_remaining = exam_end - datetime.now()
-                        hours_remaining = max(0, int(time_remaining.total_seconds() / 3600))
-                    except:
-                        hours_remaining = duration_days * 24
+            # Time remaining comes straight from columns already on the
+            # exam row - no round-trip just for date arithmetic
+            creation_date = self._parse_creation_date(exam_id, exam.get('creation_date'))
+            if creation_date is not None:
+                exam_end = creation_date + timedelta(days=duration_days)
+                time_remaining = exam_end - datetime.now()
+                hours_remaining = max(0, int(time_remaining.total_seconds() / 3600))
+            else:
+                hours_remaining = duration_days * 24
             
             submission_rate = (submitted_count / total_students) * 100
             
@@ -282,41 +297,61 @@ class SmartReminderSystem:
             # We will NOT send statistics to the group
             logger.info(f"ℹ️ Group notifications disabled - skipping group message")
             
-            # Send personalized messages ONLY to pending students (exclude managers/owners)
+            # Send personalized messages ONLY to pending students (exclude managers/owners).
+            # Sends fan out concurrently under a semaphore; the token bucket
+            # paces the overall rate so Telegram's flood limits are respected
+            # without a fixed sleep between every message.
             success_count = 0
-            for student in pending_students:
-                try:
-                    user_id = student['user_id']
-                    
-                    # Check if this user is a manager or owner - don't send reminders to them
-                    is_manager = await self._is_user_manager(user_id)
-                    is_owner = await self._is_user_owner(user_id, group_id)
-                    
-                    if is_manager or is_owner:
-                        logger.info(f"⏭️ Skipping reminder for {student['full_name']} (manager/owner)")
-                        continue
-                    
-                    # Create personalized message
-                    personal_msg = (
-                        f"⚡ **تذكير {reminder_label}**\n\n"
-                        f"مرحبًا {student['full_name']}! 👋\n\n"
-                        f"📝 الواجب/التقرير: **{exam_title}**\n"
-                        f"📚 الشعبة: **{class_name}**\n"
-                        f"⏰ الوقت المتبقي: **{hours_remaining} ساعة**\n\n"
-                        f"📊 **معلومات:**\n"
-                        f"✅ {submitted_count} من زملائك أنهوا الواجب\n"
-                        f"⏳ {len(pending_students)} طالب لم ينتهوا بعد\n"
-                        f"📈 نسبة الإنجاز: {submission_rate:.1f}%\n\n"
-                        f"🚀 **لا تتأخر!** زملاؤك يتقدمون!\n\n"
-                        f"👆 اضغط /panel للإجابة الآن"
-                    )
-                    
-                    await self.bot.send_message(user_id, personal_msg)
-                    success_count += 1
-                    await asyncio.sleep(0.05)  # Small delay to avoid rate limiting
-                    
-                except Exception as e:
-                    logger.warning(f"❌ Failed to send reminder to {student.get('full_name', 'Unknown')}: {e}")
+            semaphore = asyncio.Semaphore(REMINDER_CONCURRENCY)
+
+            # Only the greeting names the student, so the bulk of the
+            # message is formatted once per exam and each send is just a
+            # head + name + tail concatenation.
+            msg_head = f"⚡ **تذكير {reminder_label}**\n\nمرحبًا "
+            msg_tail = (
+                f"! 👋\n\n"
+                f"📝 الواجب/التقرير: **{exam_title}**\n"
+                f"📚 الشعبة: **{class_name}**\n"
+                f"⏰ الوقت المتبقي: **{hours_remaining} ساعة**\n\n"
+                f"📊 **معلومات:**\n"
+                f"✅ {submitted_count} من زملائك أنهوا الواجب\n"
+                f"⏳ {len(pending_students)} طالب لم ينتهوا بعد\n"
+                f"📈 نسبة الإنجاز: {submission_rate:.1f}%\n\n"
+                f"🚀 **لا تتأخر!** زملاؤك يتقدمون!\n\n"
+                f"👆 اضغط /panel للإجابة الآن"
+            )
+
+            async def send_reminder(student: aiosqlite.Row):
+                nonlocal success_count
+                async with semaphore:
+                    try:
+                        user_id = student['user_id']
+
+                        # Check if this user is a manager or owner - don't
+                        # send reminders to them. The two checks don't
+                        # depend on each other, so run them concurrently.
+                        is_manager, is_owner = await asyncio.gather(
+                            self._is_user_manager(user_id),
+                            self._is_user_owner(user_id, group_id)
+                        )
+
+                        if is_manager or is_owner:
+                            logger.info(f"⏭️ Skipping reminder for {student['full_name']} (manager/owner)")
+                            return
+
+                        personal_msg = msg_head + student['full_name'] + msg_tail
+
+                        await self._limiter.acquire()
+                        if await self._send_with_retry(user_id, personal_msg):
+                            success_count += 1
+
+                    except Exception as e:
+                        logger.warning(f"❌ Failed to send reminder to {student['full_name']}: {e}")
+
+            await asyncio.gather(
+                *(send_reminder(student) for student in pending_students),
+                return_exceptions=True
+            )
             
             # Mark this reminder as sent
             await self._mark_reminder_sent(exam_id, reminder_percent)
@@ -333,19 +368,69 @@ class SmartReminderSystem:
         except Exception as e:
             logger.error(f"❌ Error sending intelligent reminders: {e}")
     
+    def _parse_creation_date(self, exam_id: int, creation_str: Optional[str]) -> Optional[datetime]:
+        """Parse an exam's creation_date once, caching the result by exam id"""
+        if exam_id in self._creation_cache:
+            return self._creation_cache[exam_id]
+        try:
+            if 'T' in creation_str:
+                parsed = datetime.fromisoformat(
+                    creation_str.replace('Z', '+00:00')
+                ).replace(tzinfo=None)
+            else:
+                parsed = datetime.strptime(creation_str, '%Y-%m-%d %H:%M:%S')
+        except (TypeError, ValueError):
+            parsed = None
+        if len(self._creation_cache) > 256:
+            # Exams are long gone by the time this fills; just reset
+            self._creation_cache.clear()
+        self._creation_cache[exam_id] = parsed
+        return parsed
+
+    async def _send_with_retry(self, chat_id: int, text: str,
+                               attempts: int = SEND_MAX_ATTEMPTS) -> bool:
+        """Send a message, backing off on rate limits and network errors
+
+        Honors TelegramRetryAfter's server-provided wait and retries
+        transient network failures with jittered exponential backoff.
+        Non-retryable errors (blocked bot, deleted account, ...) propagate
+        to the caller. Returns True once the message is delivered.
+        """
+        delay = 1.0
+        for _ in range(attempts):
+            try:
+                await self.bot.send_message(chat_id, text)
+                return True
+            except TelegramRetryAfter as e:
+                await asyncio.sleep(e.retry_after + random.uniform(0, 0.5))
+            except TelegramNetworkError:
+                await asyncio.sleep(delay + random.uniform(0, delay))
+                delay *= 2
+        return False
+
     async def _is_user_manager(self, user_id: int) -> bool:
-        """Check if user is a manager of any class"""
+        """Check if user is a manager of any class (memoized per cycle)"""
+        cached = self._manager_cache.get(user_id)
+        if cached is not None:
+            return cached
         try:
             managed_classes = await self.db.get_user_managed_classes(user_id)
-            return len(managed_classes) > 0
+            result = len(managed_classes) > 0
         except Exception as e:
             logger.error(f"❌ Error checking if user is manager: {e}")
-            return False
-    
+            result = False
+        self._manager_cache[user_id] = result
+        return result
+
     async def _is_user_owner(self, user_id: int, group_id: int) -> bool:
-        """Check if user is owner of the group"""
+        """Check if user is owner of the group (memoized per cycle)"""
+        cached = self._owner_cache.get((user_id, group_id))
+        if cached is not None:
+            return cached
         try:
-            return await self.db.is_group_owner(user_id, group_id)
+            result = await self.db.is_group_owner(user_id, group_id)
         except Exception as e:
             logger.error(f"❌ Error checking if user is owner: {e}")
-            return False
+            result = False
+        self._owner_cache[(user_id, group_id)] = result
+        return result